@@ -21,6 +21,7 @@ This example script stress JLS annotation file creation.
 
 from pyjls import Reader, Writer, SourceDef, SignalDef, AnnotationType, DataType, SignalType
 import argparse
+import dataclasses
 import logging
 import numpy as np
 import os
@@ -28,6 +29,19 @@ import sys
 import time
 
 
+_BLOCK_SIZE = 10000  # annotations per annotations_bulk call
+
+
+def _make_payloads(n, size):
+    """Create n binary payloads of size bytes each.
+
+    :return: (payload, offsets) suitable for Writer.annotations_bulk().
+    """
+    payload = np.arange(n * size, dtype=np.uint8).tobytes()
+    offsets = np.arange(n + 1, dtype=np.int64) * size
+    return payload, offsets
+
+
 def parser():
     p = argparse.ArgumentParser(description='JLS generator.')
     p.add_argument('filename',
@@ -68,15 +82,21 @@ def run():
     )
 
     dargs = vars(args)
-    for key in signal.__dict__.keys():
+    for key in (f.name for f in dataclasses.fields(signal)):
         v = dargs.get(key)
         if v is not None:
             if key not in ['name', 'units']:
                 v = int(v)
             setattr(signal, key, v)
 
+    # Prebuild one block of annotations, reused for each annotations_bulk call
+    block_size = min(_BLOCK_SIZE, args.count)
+    payload, offsets = _make_payloads(block_size, 256)
+    annotation_types = np.full(block_size, AnnotationType.USER, dtype=np.uint8)
+    group_ids = np.zeros(block_size, dtype=np.uint8)
+    timestamps = np.arange(block_size, dtype=np.int64)
+
     # Write to file
-    data = bytes(range(256))
     t_start = time.time()
     t_finish = time.time()
     count = 0
@@ -86,14 +106,17 @@ def run():
             wr.source_def_from_struct(source)
             wr.signal_def_from_struct(signal)
             wr.user_data(0, 'string user data at start')
-            for count in range(args.count):
-                wr.annotation(1, count, AnnotationType.USER, 0, data)
+            while count < args.count:
+                n = min(block_size, args.count - count)
+                wr.annotations_bulk(1, timestamps[:n] + count, annotation_types[:n], group_ids[:n],
+                                    payload, offsets[:n + 1])
+                count += n
             t_finish = time.time()
     except Exception:
         logging.getLogger().exception('during write')
 
     t_end = time.time()
-    print(f'{count + 1} annotations: duration={t_end - t_start:.3f} s, close={t_end - t_finish:.3f} s')
+    print(f'{count} annotations: duration={t_end - t_start:.3f} s, close={t_end - t_finish:.3f} s')
 
 
 if __name__ == "__main__":
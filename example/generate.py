@@ -21,7 +21,9 @@ This example script generates a JLS file.
 
 from pyjls import Reader, Writer, SourceDef, SignalDef, AnnotationType, DataType, SignalType
 import argparse
+import dataclasses
 import logging
+import math
 import numpy as np
 import os
 import sys
@@ -48,17 +50,53 @@ def parser():
     return p
 
 
-def _waveform_factory(d):
+class _Sinusoid:
+    """Generate a sinusoid one chunk at a time without calling np.sin.
+
+    Expand amplitude * sin(w * n + phase) with the angle addition identity
+    so that only the scalar phase at the start of each chunk changes.
+    """
+
+    def __init__(self, amplitude, freq, sample_rate):
+        self._freq = freq
+        w = np.arange(sample_rate, dtype=np.float64) * (2.0 * np.pi * freq / sample_rate)
+        self._sin = amplitude * np.sin(w)
+        self._cos = amplitude * np.cos(w)
+        self._scratch = np.empty(sample_rate, dtype=np.float64)
+
+    def __call__(self, t0, x, y):
+        # Compute the phase exactly at each chunk start to prevent drift
+        phase = 2.0 * np.pi * math.fmod(self._freq * t0, 1.0)
+        np.multiply(self._sin, math.cos(phase), out=self._scratch)
+        y += self._scratch
+        np.multiply(self._cos, math.sin(phase), out=self._scratch)
+        y += self._scratch
+
+
+class _Ramp:
+    """Generate amplitude * t one chunk at a time."""
+
+    def __init__(self, amplitude, sample_rate):
+        self._amplitude = amplitude
+        self._scratch = np.empty(sample_rate, dtype=np.float64)
+
+    def __call__(self, t0, x, y):
+        np.multiply(x, self._amplitude, out=self._scratch, dtype=np.float64)
+        y += self._scratch
+        y += self._amplitude * t0
+
+
+def _waveform_factory(d, sample_rate):
+    """Create a waveform fn(t0, x, y) that adds its samples for times t0 + x into y."""
     if d is None or not len(d):
         return None
     parts = d.split(',')
     name = parts[0].lower()
     if name == 'ramp':
         if len(parts) == 1:
-            return lambda x: x
+            return _Ramp(1.0, sample_rate)
         elif len(parts) == 2:
-            amplitude = float(parts[1])
-            return lambda x: x * amplitude
+            return _Ramp(float(parts[1]), sample_rate)
         else:
             raise ValueError('Invalid ramp specification')
     elif name in ['sin', 'sine', 'sinusoid', 'cos', 'cosine', 'freq', 'frequency', 'tone']:
@@ -66,7 +104,7 @@ def _waveform_factory(d):
             raise RuntimeError(f'Must specify {name},amplitude,frequency')
         amplitude = float(parts[1])
         freq = float(parts[2])
-        return lambda x: amplitude * np.sin((2.0 * np.pi * freq) * x)
+        return _Sinusoid(amplitude, freq, sample_rate)
     else:
         raise RuntimeError(f'Unknown waveform: {name}')
 
@@ -100,7 +138,7 @@ def run():
     )
 
     dargs = vars(args)
-    for key in signal.__dict__.keys():
+    for key in (f.name for f in dataclasses.fields(signal)):
         v = dargs.get(key)
         if v is not None:
             if key not in ['name', 'units']:
@@ -109,15 +147,18 @@ def run():
 
     waveforms = []
     for waveform_def in args.add:
-        fn = _waveform_factory(waveform_def)
+        fn = _waveform_factory(waveform_def, signal.sample_rate)
         if fn is not None:
             waveforms.append(fn)
 
-    # generate waveform, 1 second chunk at a time
-    x = np.arange(signal.sample_rate, dtype=np.float64) * 1 / signal.sample_rate
+    # generate waveform, 1 second chunk at a time.
+    # x is the time offset within each chunk, and t0 is the chunk start time
+    # computed from the integer sample_id so that precision does not degrade.
+    x = np.arange(signal.sample_rate, dtype=np.float32) / np.float32(signal.sample_rate)
 
     # Write to file
     y_len = len(x)
+    y = np.zeros(y_len, dtype=np.float64)
     sample_id = 0
     with Writer(args.filename) as wr:
         wr.source_def_from_struct(source)
@@ -125,14 +166,14 @@ def run():
         wr.user_data(0, 'string user data at start')
         length = args.length
         while length > 0:  # write data chunks
-            y = np.zeros(y_len, dtype=np.float64)
+            y.fill(0.0)
+            t0 = sample_id / signal.sample_rate
             for waveform in waveforms:
-                y += waveform(x)
+                waveform(t0, x, y)
             iter_len = y_len if y_len < length else length
-            wr.fsr_f32(1, sample_id, y[:iter_len].astype(dtype=np.float32))
+            wr.fsr_f32_from_f64(1, sample_id, y[:iter_len])
             sample_id += iter_len
             length -= iter_len
-            x += 1.0  # increment
         wr.user_data(42, b'binary data')
         wr.user_data(43, {'my': 'data', 'json': [1, 2, 3]})
 
@@ -17,18 +17,25 @@ Python binding for the native JLS implementation.
 """
 
 # See https://cython.readthedocs.io/en/latest/index.html
+# Compiler directives are set in setup.py.  Explicitly check lengths
+# before indexing typed memoryviews, since boundscheck is disabled.
 
-# cython: boundscheck=True, wraparound=True, nonecheck=True, overflowcheck=True, cdivision=True
-
-from libc.stdint cimport uint8_t, uint16_t, uint32_t, uint64_t, int32_t, int64_t
+from libc.stdint cimport uint8_t, uint16_t, uint32_t, uint64_t, int32_t, int64_t, UINT32_MAX
 from libc.float cimport DBL_MAX
 from libc.math cimport isfinite, NAN
+from cpython.mem cimport PyMem_Malloc, PyMem_Free
+cimport cython
 
 from collections.abc import Mapping
 import json
 import logging
 import numpy as np
+import threading
 import time
+try:
+    import orjson
+except ImportError:
+    orjson = None
 cimport numpy as np
 from . cimport c_jls
 from .structs import SourceDef, SignalDef
@@ -43,6 +50,7 @@ _log_c = logging.getLogger(_log_c_name)
 # _UTC_OFFSET = dateutil.parser.parse('2018-01-01T00:00:00Z').timestamp()
 _UTC_OFFSET = 1514764800  # seconds
 DEF _JLS_SIGNAL_COUNT = 256  # From jls/format.h
+DEF _F64_BLOCK_SIZE = 65536  # samples per fsr_f32_from_f64() conversion block
 
 
 def _data_type_def(basetype, size, q):
@@ -108,7 +116,7 @@ class SummaryFSR:
     COUNT = c_jls.JLS_SUMMARY_FSR_COUNT
 
 
-cdef void _log_cbk(const char * msg):
+cdef void _log_cbk(const char * msg) with gil:
     m = msg.decode('utf-8').strip()
     level, location, s = m.split(' ', 2)
     lvl = _log_level_map.get(level, logging.DEBUG)
@@ -139,13 +147,48 @@ def _storage_pack(data):
     if isinstance(data, str):
         s = _encode_str(data)
         return c_jls.JLS_STORAGE_TYPE_STRING, s, len(s) + 1
-    elif isinstance(data, bytes):
+    elif isinstance(data, (bytes, bytearray)):
         return c_jls.JLS_STORAGE_TYPE_BINARY, data, len(data)
+    elif isinstance(data, memoryview):
+        data = data.cast('B')  # length in bytes, not items
+        return c_jls.JLS_STORAGE_TYPE_BINARY, data, data.nbytes
     else:
-        s = _encode_str(json.dumps(data))
+        s = _json_dumps(data)
         return c_jls.JLS_STORAGE_TYPE_JSON, s, len(s) + 1
 
 
+def _json_default(obj):
+    raise TypeError(f'{type(obj).__name__} is not JSON serializable')
+
+
+_ORJSON_OPTIONS = 0 if orjson is None else (
+    orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_SUBCLASS)
+
+
+def _json_dumps(data):
+    """Serialize to JSON bytes, using orjson when available.
+
+    orjson only handles the plain JSON types, and anything else falls
+    back to the json module so that the accepted inputs do not depend
+    on whether orjson is installed.
+    """
+    if orjson is not None:
+        try:
+            s = orjson.dumps(data, default=_json_default, option=_ORJSON_OPTIONS)
+        except TypeError:
+            pass  # unsupported by orjson, such as large ints
+        else:
+            if b'null' not in s:
+                return s
+            # orjson writes NaN and Infinity as null, json preserves them
+    return _encode_str(json.dumps(data))
+
+
+def _json_loads(s):
+    # not orjson, which parses integers beyond 64 bits as float
+    return json.loads(s.decode('utf-8'))
+
+
 cdef _storage_unpack(uint8_t storage_type, const uint8_t * data, uint32_t data_size):
     cdef const char * str = <const char *> data
     if storage_type == c_jls.JLS_STORAGE_TYPE_STRING:
@@ -153,11 +196,13 @@ cdef _storage_unpack(uint8_t storage_type, const uint8_t * data, uint32_t data_s
     elif storage_type == c_jls.JLS_STORAGE_TYPE_BINARY:
         return data[:data_size]
     else:
-        return json.loads(str[:data_size - 1].decode('utf-8'))
+        return _json_loads(str[:data_size - 1])
 
 
 def _utc_to_jls(utc):
     """Convert from python UTC timestamp to jls timestamp."""
+    if isinstance(utc, (int, np.integer)):
+        return (int(utc) - _UTC_OFFSET) << 30  # exact, no float round trip
     return int((utc - _UTC_OFFSET) * (2**30))
 
 
@@ -167,11 +212,19 @@ def _jls_to_utc(timestamp):
 
 
 cdef class Writer:
+    """Write a JLS file.
+
+    All methods may be called from multiple threads.  Calls into the
+    native writer are serialized by an internal lock, which close()
+    also holds while freeing the native writer.
+    """
     cdef c_jls.jls_twr_s * _wr
+    cdef object _lock
     cdef c_jls.jls_signal_def_s _signals[_JLS_SIGNAL_COUNT]
 
     def __init__(self, path: str):
         cdef int32_t rc
+        self._lock = threading.RLock()
         self._signals[0].signal_type = c_jls.JLS_SIGNAL_TYPE_VSR
         rc = c_jls.jls_twr_open(&self._wr, path.encode('utf-8'))
         if rc:
@@ -184,10 +237,26 @@ cdef class Writer:
         self.close()
 
     def close(self):
-        c_jls.jls_twr_close(self._wr)
+        cdef c_jls.jls_twr_s * wr
+        with self._lock:
+            if self._wr != NULL:
+                wr = self._wr
+                self._wr = NULL
+                with nogil:
+                    c_jls.jls_twr_close(wr)
+
+    cdef c_jls.jls_twr_s * _wr_open(self) except NULL:
+        """Get the native writer, which requires holding self._lock."""
+        if self._wr == NULL:
+            raise RuntimeError('writer is closed')
+        return self._wr
 
     def flush(self):
-        c_jls.jls_twr_flush(self._wr)
+        cdef c_jls.jls_twr_s * wr
+        with self._lock:
+            wr = self._wr_open()
+            with nogil:
+                c_jls.jls_twr_flush(wr)
 
     def source_def(self, source_id, name=None, vendor=None, model=None, version=None, serial_number=None):
         cdef int32_t rc
@@ -203,7 +272,8 @@ cdef class Writer:
         s.model = model_b
         s.version = version_b
         s.serial_number = serial_number_b
-        rc = c_jls.jls_twr_source_def(self._wr, &s)
+        with self._lock:
+            rc = c_jls.jls_twr_source_def(self._wr_open(), &s)
         if rc:
             raise RuntimeError(f'source_def failed {rc}')
 
@@ -237,7 +307,8 @@ cdef class Writer:
         units_b = _encode_str(units)
         s.name = name_b
         s.units = units_b
-        rc = c_jls.jls_twr_signal_def(self._wr, s)
+        with self._lock:
+            rc = c_jls.jls_twr_signal_def(self._wr_open(), s)
         if rc:
             raise RuntimeError(f'signal_def failed {rc}')
 
@@ -258,36 +329,252 @@ cdef class Writer:
 
     def user_data(self, chunk_meta, data):
         cdef int32_t rc
+        cdef const uint8_t [::1] c_payload
+        cdef const uint8_t * c_payload_ptr = NULL
         storage_type, payload, payload_length = _storage_pack(data)
-        rc = c_jls.jls_twr_user_data(self._wr, chunk_meta, storage_type, payload, payload_length)
+        c_payload = payload
+        if payload_length:
+            c_payload_ptr = &c_payload[0]
+        with self._lock:
+            rc = c_jls.jls_twr_user_data(self._wr_open(), chunk_meta, storage_type, c_payload_ptr, payload_length)
         if rc:
             raise RuntimeError(f'user_data failed {rc}')
 
+    def user_data_many(self, records):
+        """Add multiple user data entries with a single call.
+
+        :param records: The iterable of (chunk_meta, data) pairs,
+            the same as the user_data() arguments.
+            Each chunk_meta must be in the range 0 to 0x0fff.
+
+        This method is equivalent to calling user_data() for each record,
+        but it only releases the GIL once.
+        """
+        cdef int32_t rc = 0
+        cdef c_jls.jls_twr_s * wr
+        cdef const uint8_t [::1] c_payload
+        cdef const uint8_t * c_payload_ptr = NULL
+        cdef uint16_t [::1] c_chunk_meta
+        cdef uint8_t [::1] c_storage_types
+        cdef int64_t [::1] c_offsets
+        cdef Py_ssize_t idx
+        cdef Py_ssize_t count
+
+        chunk_metas = []
+        storage_types = []
+        offsets = [0]
+        offset = 0
+        parts = []
+        for chunk_meta, data in records:
+            chunk_meta = int(chunk_meta)
+            if not 0 <= chunk_meta <= 0x0fff:
+                raise ValueError(f'invalid chunk_meta {chunk_meta}')
+            storage_type, payload, payload_length = _storage_pack(data)
+            parts.append(payload)
+            if payload_length > len(payload):
+                parts.append(b'\0')  # string and JSON include the terminator
+            chunk_metas.append(chunk_meta)
+            storage_types.append(storage_type)
+            offset += payload_length
+            offsets.append(offset)
+        count = len(chunk_metas)
+        if count == 0:
+            return
+        c_payload = b''.join(parts)
+        if len(c_payload) != offset:  # payload_length is in bytes, see _storage_pack()
+            raise RuntimeError('user_data_many payload length mismatch')
+        c_chunk_meta = np.array(chunk_metas, dtype=np.uint16)
+        c_storage_types = np.array(storage_types, dtype=np.uint8)
+        c_offsets = np.array(offsets, dtype=np.int64)
+        if len(c_payload):
+            c_payload_ptr = &c_payload[0]
+
+        with self._lock:
+            wr = self._wr_open()
+            with nogil:
+                for idx in range(count):
+                    rc = c_jls.jls_twr_user_data(wr, c_chunk_meta[idx],
+                        <c_jls.jls_storage_type_e> c_storage_types[idx], c_payload_ptr + c_offsets[idx],
+                        <uint32_t> (c_offsets[idx + 1] - c_offsets[idx]))
+                    if rc:
+                        break
+        if rc:
+            raise RuntimeError(f'user_data_many failed {rc}')
+
     def fsr_f32(self, signal_id, sample_id, data):
+        """Write float32 sample data to a FSR signal.
+
+        :param signal_id: The signal id.
+        :param sample_id: The sample id for data[0].
+        :param data: The 1-D sample data.  C-contiguous float32 data,
+            including read-only buffers, is written without a copy.
+            Other arrays are converted to float32.
+        """
         cdef int32_t rc
-        cdef np.float32_t [::1] f32 = data
-        rc = c_jls.jls_twr_fsr_f32(self._wr, signal_id, sample_id, &f32[0], len(data))
+        cdef c_jls.jls_twr_s * wr
+        cdef uint16_t c_signal_id = signal_id
+        cdef int64_t c_sample_id = sample_id
+        cdef const np.float32_t [::1] f32 = np.ascontiguousarray(data, dtype=np.float32)
+        cdef uint32_t length
+        cdef const float * c_ptr
+        if len(f32) > UINT32_MAX:
+            raise OverflowError('data too long')
+        length = len(f32)
+        if not length:
+            return
+        c_ptr = &f32[0]
+        with self._lock:
+            wr = self._wr_open()
+            with nogil:
+                rc = c_jls.jls_twr_fsr_f32(wr, c_signal_id, c_sample_id, c_ptr, length)
         if rc:
             raise RuntimeError(f'fsr_f32 failed {rc}')
 
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    def fsr_f32_from_f64(self, signal_id, sample_id, data):
+        """Write float64 sample data to a float32 FSR signal.
+
+        :param signal_id: The signal id.
+        :param sample_id: The sample id for data[0].
+        :param data: The 1-D float64 sample data.  float32 data is
+            passed directly to fsr_f32().
+
+        The conversion to float32 occurs in C in fixed-size blocks,
+        which avoids allocating a float32 copy of the full data.
+        """
+        cdef int32_t rc = 0
+        cdef uint16_t c_signal_id = signal_id
+        cdef int64_t c_sample_id = sample_id
+        cdef const double [::1] f64
+        cdef uint32_t length
+        cdef uint32_t offset = 0
+        cdef uint32_t block
+        cdef uint32_t idx
+        cdef float * f32
+        cdef c_jls.jls_twr_s * wr
+        if isinstance(data, np.ndarray) and data.dtype == np.float32:
+            return self.fsr_f32(signal_id, sample_id, data)
+        f64 = np.ascontiguousarray(data, dtype=np.float64)
+        if len(f64) > UINT32_MAX:
+            raise OverflowError('data too long')
+        length = len(f64)
+        if not length:
+            return
+        f32 = <float *> PyMem_Malloc(min(length, _F64_BLOCK_SIZE) * sizeof(float))
+        if not f32:
+            raise MemoryError()
+        try:
+            with self._lock:
+                wr = self._wr_open()
+                with nogil:
+                    while offset < length:
+                        block = min(length - offset, _F64_BLOCK_SIZE)
+                        for idx in range(block):
+                            f32[idx] = <float> f64[offset + idx]
+                        rc = c_jls.jls_twr_fsr_f32(wr, c_signal_id, c_sample_id + offset, f32, block)
+                        if rc:
+                            break
+                        offset += block
+        finally:
+            PyMem_Free(f32)
+        if rc:
+            raise RuntimeError(f'fsr_f32_from_f64 failed {rc}')
+
     def annotation(self, signal_id, timestamp, y, annotation_type, group_id, data):
         cdef int32_t rc
+        cdef const uint8_t [::1] c_payload
+        cdef const uint8_t * c_payload_ptr = NULL
         if isinstance(annotation_type, str):
             annotation_type = _annotation_map[annotation_type.lower()]
         storage_type, payload, payload_length = _storage_pack(data)
+        c_payload = payload
+        if payload_length:
+            c_payload_ptr = &c_payload[0]
         if y is None or not np.isfinite(y):
             y = NAN
         if self._signals[signal_id].signal_type == c_jls.JLS_SIGNAL_TYPE_VSR:
             timestamp = _utc_to_jls(timestamp)
-        rc = c_jls.jls_twr_annotation(self._wr, signal_id, timestamp, y, annotation_type,
-            group_id, storage_type, payload, payload_length)
+        with self._lock:
+            rc = c_jls.jls_twr_annotation(self._wr_open(), signal_id, timestamp, y, annotation_type,
+                group_id, storage_type, c_payload_ptr, payload_length)
         if rc:
             raise RuntimeError(f'annotation failed {rc}')
 
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    def annotations_bulk(self, signal_id, timestamps, annotation_types, group_ids, payload, offsets):
+        """Add multiple binary annotations with a single call.
+
+        :param signal_id: The signal id.
+        :param timestamps: The length N array of timestamps.  FSR uses sample_id.  VSR uses utc.
+        :param annotation_types: The length N array of annotation types.
+        :param group_ids: The length N array of group ids.
+        :param payload: The concatenated binary data for all annotations.
+        :param offsets: The length N + 1 array of offsets into payload.
+            Annotation i contains payload[offsets[i]:offsets[i + 1]].
+
+        This method is equivalent to calling annotation() N times
+        with y=None and binary data, but it only crosses the
+        Python / C boundary once.
+        """
+        cdef int32_t rc = 0
+        cdef c_jls.jls_twr_s * wr
+        cdef uint16_t c_signal_id = signal_id
+        cdef const int64_t [::1] c_timestamps
+        cdef const uint8_t [::1] c_annotation_types
+        cdef const uint8_t [::1] c_group_ids
+        cdef const uint8_t [::1] c_payload = payload
+        cdef const int64_t [::1] c_offsets
+        cdef const uint8_t * c_payload_ptr = NULL
+        cdef Py_ssize_t idx
+        cdef Py_ssize_t count
+
+        if self._signals[signal_id].signal_type == c_jls.JLS_SIGNAL_TYPE_VSR:
+            timestamps = np.asarray(timestamps)
+            if np.issubdtype(timestamps.dtype, np.integer):
+                # exact, no float round trip, same as _utc_to_jls()
+                timestamps = (timestamps.astype(np.int64) - _UTC_OFFSET) << 30
+            else:
+                timestamps = (timestamps.astype(np.float64) - _UTC_OFFSET) * (2**30)
+        c_timestamps = np.ascontiguousarray(timestamps, dtype=np.int64)
+        c_annotation_types = np.ascontiguousarray(annotation_types, dtype=np.uint8)
+        c_group_ids = np.ascontiguousarray(group_ids, dtype=np.uint8)
+        offsets = np.ascontiguousarray(offsets, dtype=np.int64)
+        count = len(c_timestamps)
+        if len(c_annotation_types) != count or len(c_group_ids) != count:
+            raise ValueError('timestamps, annotation_types and group_ids length mismatch')
+        if len(offsets) != count + 1:
+            raise ValueError('offsets must have length len(timestamps) + 1')
+        if count == 0:
+            return
+        lengths = np.diff(offsets)
+        if offsets[0] < 0 or offsets[count] > len(c_payload) or np.any(lengths < 0):
+            raise ValueError('offsets must be increasing and within payload')
+        if np.any(lengths > UINT32_MAX):
+            raise ValueError('annotation payload too long')
+        c_offsets = offsets
+        if len(c_payload):
+            c_payload_ptr = &c_payload[0]
+
+        with self._lock:
+            wr = self._wr_open()
+            with nogil:
+                for idx in range(count):
+                    rc = c_jls.jls_twr_annotation(wr, c_signal_id, c_timestamps[idx], NAN,
+                        <c_jls.jls_annotation_type_e> c_annotation_types[idx], c_group_ids[idx],
+                        c_jls.JLS_STORAGE_TYPE_BINARY, c_payload_ptr + c_offsets[idx],
+                        <uint32_t> (c_offsets[idx + 1] - c_offsets[idx]))
+                    if rc:
+                        break
+        if rc:
+            raise RuntimeError(f'annotations_bulk failed {rc}')
+
     def utc(self, signal_id, sample_id, utc):
         cdef int32_t rc
         utc = _utc_to_jls(utc)
-        rc = c_jls.jls_twr_utc(self._wr, signal_id, sample_id, utc)
+        with self._lock:
+            rc = c_jls.jls_twr_utc(self._wr_open(), signal_id, sample_id, utc)
         if rc:
             raise RuntimeError(f'utc failed {rc}')
 
@@ -301,8 +588,30 @@ cdef class AnnotationCallback:
         self.cbk_fn = cbk_fn
 
 
+cdef class AnnotationBatchCallback:
+    cdef uint8_t is_fsr
+    cdef object cbk_fn
+    cdef list batch
+    cdef Py_ssize_t batch_size
+    cdef object exception
+
+    def __init__(self, is_fsr, cbk_fn, batch_size):
+        self.is_fsr = is_fsr
+        self.cbk_fn = cbk_fn
+        self.batch = []
+        self.batch_size = batch_size
+        self.exception = None
+
+
 cdef class Reader:
+    """Read a JLS file.
+
+    All methods may be called from multiple threads.  Calls into the
+    native reader are serialized by an internal lock, and fsr(),
+    fsr_into() and fsr_statistics() release the GIL while reading.
+    """
     cdef c_jls.jls_rd_s * _rd
+    cdef object _lock
     cdef object _sources
     cdef object _signals
 
@@ -312,6 +621,7 @@ cdef class Reader:
         cdef c_jls.jls_signal_def_s * signals
         cdef uint16_t count
         cdef int64_t samples
+        self._lock = threading.RLock()  # reentrant for reads from callbacks
         self._sources: Mapping[int, SourceDef] = {}
         self._signals: Mapping[int, SignalDef] = {}
         rc = c_jls.jls_rd_open(&self._rd, path.encode('utf-8'))
@@ -364,7 +674,16 @@ cdef class Reader:
         self.close()
 
     def close(self):
-        c_jls.jls_rd_close(self._rd)
+        with self._lock:
+            if self._rd != NULL:
+                c_jls.jls_rd_close(self._rd)
+                self._rd = NULL
+
+    cdef c_jls.jls_rd_s * _rd_open(self) except NULL:
+        """Get the native reader, which requires holding self._lock."""
+        if self._rd == NULL:
+            raise RuntimeError('reader is closed')
+        return self._rd
 
     @property
     def sources(self) -> Mapping[int, SourceDef]:
@@ -375,14 +694,38 @@ cdef class Reader:
         return self._signals
 
     def fsr(self, signal_id, start_sample_id, length):
-        cdef int32_t rc
-        cdef np.float32_t [::1] c_data
         data = np.empty(length, dtype=np.float32)
-        c_data = data
-        rc = c_jls.jls_rd_fsr_f32(self._rd, signal_id, start_sample_id, &c_data[0], length)
+        self.fsr_into(signal_id, start_sample_id, data)
+        return data
+
+    def fsr_into(self, signal_id, start_sample_id, np.float32_t [::1] out not None):
+        """Read FSR sample data into an existing array.
+
+        :param signal_id: The signal id.
+        :param start_sample_id: The starting sample id to read.
+        :param out: The writable, C-contiguous, 1-D float32 array to fill.
+            This method reads len(out) samples.
+        :return: The number of samples read.
+
+        Unlike fsr(), this method allows callers to reuse the same
+        buffer for repeated reads.  Use a separate buffer per thread.
+        """
+        cdef int32_t rc
+        cdef uint16_t c_signal_id = signal_id
+        cdef int64_t c_start_sample_id = start_sample_id
+        cdef int64_t c_length = len(out)
+        cdef float * c_ptr
+        cdef c_jls.jls_rd_s * rd
+        if not c_length:
+            return 0
+        c_ptr = &out[0]
+        with self._lock:
+            rd = self._rd_open()
+            with nogil:
+                rc = c_jls.jls_rd_fsr_f32(rd, c_signal_id, c_start_sample_id, c_ptr, c_length)
         if rc:
             raise RuntimeError(f'fsr failed {rc}')
-        return data
+        return c_length
 
     def fsr_statistics(self, signal_id, start_sample_id, increment, length):
         """Read FSR statistics.
@@ -392,13 +735,30 @@ cdef class Reader:
         :param increment: The number of samples represented per return value.
         :param length: The number of return values to generate.
         :return The 2-D array[summary][stat] where the stat column is defined by SummaryFSR.
+
+        The GIL is released while reading, so statistics for multiple
+        Readers may be computed concurrently from separate threads.
+        Calls on the same Reader are serialized.
         """
 
         cdef int32_t rc
+        cdef uint16_t c_signal_id = signal_id
+        cdef int64_t c_start_sample_id = start_sample_id
+        cdef int64_t c_increment = increment
+        cdef int64_t c_length = length
         cdef np.float32_t [:, :] c_data
+        cdef float * c_ptr
+        cdef c_jls.jls_rd_s * rd
         data = np.empty((length, c_jls.JLS_SUMMARY_FSR_COUNT), dtype=np.float32)
+        if not c_length:
+            return data
         c_data = data
-        rc = c_jls.jls_rd_fsr_f32_statistics(self._rd, signal_id, start_sample_id, increment, &c_data[0, 0], length)
+        c_ptr = &c_data[0, 0]
+        with self._lock:
+            rd = self._rd_open()
+            with nogil:
+                rc = c_jls.jls_rd_fsr_f32_statistics(rd, c_signal_id, c_start_sample_id, c_increment,
+                                                     c_ptr, c_length)
         if rc:
             raise RuntimeError(f'fsr_statistics failed {rc}')
         return data
@@ -415,16 +775,66 @@ cdef class Reader:
         cdef int32_t rc
         is_fsr = self._signals[signal_id].signal_type == c_jls.JLS_SIGNAL_TYPE_FSR
         user_data = AnnotationCallback(is_fsr, cbk_fn)
-        rc = c_jls.jls_rd_annotations(self._rd, signal_id, timestamp, _annotation_cbk_fn, <void *> user_data)
+        with self._lock:
+            rc = c_jls.jls_rd_annotations(self._rd_open(), signal_id, timestamp, _annotation_cbk_fn,
+                                          <void *> user_data)
+        if rc:
+            raise RuntimeError(f'annotations failed {rc}')
+
+    def annotations_bulk(self, signal_id, timestamp, cbk_fn, batch_size=None):
+        """Read annotations from a signal in batches.
+
+        :param signal_id: The signal id.
+        :param timestamp: The starting timestamp.  FSR uses sample_id.  VSR uses utc.
+        :param cbk: The function(annotations) to call for each batch.
+            Annotations is a list of (timestamp, y, annotation_type, group_id, data)
+            tuples, the same as the annotations() callback arguments.
+            Return True to stop iteration over the annotations
+            or False to continue iterating.  Exceptions raised by
+            cbk stop iteration and propagate to the caller.
+        :param batch_size: The maximum number of annotations per batch.
+            None (default) is 1000.
+
+        This method is equivalent to annotations(), but it only calls
+        into Python once per batch.
+        """
+        cdef int32_t rc
+        batch_size = 1000 if batch_size is None else int(batch_size)
+        if batch_size < 1:
+            raise ValueError('batch_size must be at least 1')
+        is_fsr = self._signals[signal_id].signal_type == c_jls.JLS_SIGNAL_TYPE_FSR
+        user_data = AnnotationBatchCallback(is_fsr, cbk_fn, batch_size)
+        with self._lock:
+            rc = c_jls.jls_rd_annotations(self._rd_open(), signal_id, timestamp, _annotation_batch_cbk_fn,
+                                          <void *> user_data)
+        if user_data.exception is not None:
+            raise user_data.exception
         if rc:
             raise RuntimeError(f'annotations failed {rc}')
+        if user_data.batch:
+            cbk_fn(user_data.batch)
 
     def user_data(self, cbk_fn):
         cdef int32_t rc
-        rc = c_jls.jls_rd_user_data(self._rd, _user_data_cbk_fn, <void *> cbk_fn)
+        with self._lock:
+            rc = c_jls.jls_rd_user_data(self._rd_open(), _user_data_cbk_fn, <void *> cbk_fn)
         if rc:
             raise RuntimeError(f'annotations failed {rc}')
 
+    def user_data_all(self):
+        """Read all user data.
+
+        :return: The list of (chunk_meta, data) pairs, the same as the
+            user_data() callback arguments.
+        """
+        cdef int32_t rc
+        cdef list result = []
+        with self._lock:
+            rc = c_jls.jls_rd_user_data(self._rd_open(), _user_data_all_cbk_fn, <void *> result)
+        if rc:
+            raise RuntimeError(f'user_data_all failed {rc}')
+        return result
+
     def utc(self, signal_id, sample_id, cbk_fn):
         """Read the sample_id / utc pairs from a FSR signal.
 
@@ -437,42 +847,80 @@ cdef class Reader:
             or False to continue iterating.
         """
         cdef int32_t rc
-        rc = c_jls.jls_rd_utc(self._rd, signal_id, sample_id, _utc_cbk_fn, <void *> cbk_fn)
+        with self._lock:
+            rc = c_jls.jls_rd_utc(self._rd_open(), signal_id, sample_id, _utc_cbk_fn, <void *> cbk_fn)
         if rc:
             raise RuntimeError(f'utc failed {rc}')
 
 
-cdef int32_t _annotation_cbk_fn(void * user_data, const c_jls.jls_annotation_s * annotation):
-    obj: AnnotationCallback = <object> user_data
+cdef tuple _annotation_unpack(uint8_t is_fsr, const c_jls.jls_annotation_s * annotation):
     data = _storage_unpack(annotation[0].storage_type, annotation[0].data, annotation[0].data_size)
     y = annotation[0].y
     timestamp = annotation[0].timestamp
-    if not obj.is_fsr:
+    if not is_fsr:
         timestamp = _jls_to_utc(annotation[0].timestamp)
     if not isfinite(y):
         y = None
+    return timestamp, y, annotation[0].annotation_type, annotation[0].group_id, data
+
+
+cdef int32_t _annotation_cbk_fn(void * user_data, const c_jls.jls_annotation_s * annotation):
+    obj: AnnotationCallback = <object> user_data
+    args = _annotation_unpack(obj.is_fsr, annotation)
     try:
-        rc = obj.cbk_fn(timestamp, y, annotation[0].annotation_type, annotation[0].group_id, data)
+        rc = obj.cbk_fn(*args)
     except Exception:
         logging.getLogger(__name__).exception('in annotation callback')
         return 1
     return 1 if bool(rc) else 0
 
 
+cdef int32_t _annotation_batch_cbk_fn(void * user_data, const c_jls.jls_annotation_s * annotation):
+    obj: AnnotationBatchCallback = <object> user_data
+    try:
+        obj.batch.append(_annotation_unpack(obj.is_fsr, annotation))
+        if len(obj.batch) < obj.batch_size:
+            return 0
+        batch, obj.batch = obj.batch, []
+        rc = obj.cbk_fn(batch)
+    except Exception as ex:
+        obj.exception = ex  # raised by annotations_bulk() once the reader returns
+        return 1
+    return 1 if bool(rc) else 0
+
+
 cdef int32_t _user_data_cbk_fn(void * user_data, uint16_t chunk_meta, c_jls.jls_storage_type_e storage_type,
         uint8_t * data, uint32_t data_size):
     cbk_fn = <object> user_data
-    d = _storage_unpack(storage_type, data, data_size)
-    rc = cbk_fn(chunk_meta, d)
+    try:
+        d = _storage_unpack(storage_type, data, data_size)
+        rc = cbk_fn(chunk_meta, d)
+    except Exception:
+        logging.getLogger(__name__).exception('in user_data callback')
+        return 1
     return 1 if bool(rc) else 0
 
 
+cdef int32_t _user_data_all_cbk_fn(void * user_data, uint16_t chunk_meta, c_jls.jls_storage_type_e storage_type,
+        uint8_t * data, uint32_t data_size):
+    result = <list> user_data
+    try:
+        result.append((chunk_meta, _storage_unpack(storage_type, data, data_size)))
+    except Exception:
+        logging.getLogger(__name__).exception('in user_data callback')
+        return 1
+    return 0
+
+
 cdef int32_t _utc_cbk_fn(void * user_data, const c_jls.jls_utc_summary_entry_s * utc, uint32_t size):
     cdef uint32_t idx
+    cdef double offset = _UTC_OFFSET
+    cdef int64_t [:, ::1] c_entries
     cbk_fn = <object> user_data
     entries = np.empty((size, 2), dtype=np.int64)
-    for idx in range(size):
-        entries[idx, 0] = utc[idx].sample_id
-        entries[idx, 1] = _jls_to_utc(utc[idx].timestamp)
+    c_entries = entries
+    for idx in range(size):  # same truncation as _jls_to_utc() assigned to int64
+        c_entries[idx, 0] = utc[idx].sample_id
+        c_entries[idx, 1] = <int64_t> ((<double> utc[idx].timestamp) / (1 << 30) + offset)
     rc = cbk_fn(entries)
     return 1 if bool(rc) else 0
@@ -91,7 +91,7 @@ cdef extern from "jls/time.h":
     int64_t jls_now()
 
 
-cdef extern from "jls/threaded_writer.h":
+cdef extern from "jls/threaded_writer.h" nogil:
     struct jls_twr_s
     int32_t jls_twr_open(jls_twr_s ** instance, const char * path)
     int32_t jls_twr_close(jls_twr_s * self)
@@ -121,9 +121,9 @@ cdef extern from "jls/reader.h":
     int32_t jls_rd_signals(jls_rd_s * self, jls_signal_def_s ** signals, uint16_t * count)
     int32_t jls_rd_signal(jls_rd_s * self, uint16_t signal_id, jls_signal_def_s * signal)
     int32_t jls_rd_fsr_length(jls_rd_s * self, uint16_t signal_id, int64_t * samples)
-    int32_t jls_rd_fsr_f32(jls_rd_s * self, uint16_t signal_id, int64_t start_sample_id, float * data, int64_t data_length)
+    int32_t jls_rd_fsr_f32(jls_rd_s * self, uint16_t signal_id, int64_t start_sample_id, float * data, int64_t data_length) nogil
     int32_t jls_rd_fsr_f32_statistics(jls_rd_s * self, uint16_t signal_id,
-        int64_t start_sample_id, int64_t increment, float * data, int64_t data_length)
+        int64_t start_sample_id, int64_t increment, float * data, int64_t data_length) nogil
     ctypedef int32_t (*jls_rd_annotation_cbk_fn)(void * user_data, const jls_annotation_s * annotation)
     int32_t jls_rd_annotations(jls_rd_s * self, uint16_t signal_id,
         int64_t timestamp, jls_rd_annotation_cbk_fn cbk_fn, void * cbk_user_data)
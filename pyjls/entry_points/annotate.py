@@ -47,15 +47,15 @@ def on_cmd(args):
                 if signal.signal_id:
                     w.signal_def_from_struct(signal)
         signal = signals[1]  # for now
-        generator = np.random.default_rng()
-        timestamps = generator.integers(0, signal.length, 12)
-        timestamps = sorted(timestamps)
+        generator = np.random.Generator(np.random.SFC64())
+        timestamps = np.sort(generator.integers(0, signal.length, 12)).tolist()
         event_strs = ['on', 'off', 'start', 'stop', 'off by 1']
+        event_idx = generator.integers(0, len(event_strs), size=len(timestamps))
         marker_idx = 1
         for idx, timestamp in enumerate(timestamps):
             anno_type = idx % 4
             if anno_type <= 1:
-                event_str = np.random.choice(event_strs)
+                event_str = event_strs[event_idx[idx]]
                 w.annotation(signal.signal_id, timestamp, AnnotationType.TEXT, 0, None, event_str)
             elif anno_type == 2:
                 w.annotation(signal.signal_id, timestamp, AnnotationType.MARKER, 0, None, str(marker_idx))
@@ -12,9 +12,25 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 
 
+def _slots(cls):
+    """Rebuild a dataclass with __slots__ to remove the per-instance __dict__.
+
+    Equivalent to dataclass(slots=True), which requires Python 3.10.
+    """
+    names = tuple(f.name for f in fields(cls))
+    cls_dict = dict(cls.__dict__)
+    for name in names:
+        cls_dict.pop(name, None)
+    cls_dict.pop('__dict__', None)
+    cls_dict.pop('__weakref__', None)
+    cls_dict['__slots__'] = names
+    return type(cls)(cls.__name__, cls.__bases__, cls_dict)
+
+
+@_slots
 @dataclass
 class SourceDef:
     source_id: int
@@ -25,13 +41,19 @@ class SourceDef:
     serial_number: str = None
 
     def info(self, verbose=None) -> str:
-        strs = [f'{self.source_id}: {self.name}']
-        if verbose:
-            for field in ['vendor', 'model', 'version', 'serial_number']:
-                strs.append(f'    {field}: {getattr(self, field)}')
-        return '\n'.join(strs)
+        hdr = f'{self.source_id}: {self.name}'
+        if not verbose:
+            return hdr
+        return '\n'.join((
+            hdr,
+            f'    vendor: {self.vendor}',
+            f'    model: {self.model}',
+            f'    version: {self.version}',
+            f'    serial_number: {self.serial_number}',
+        ))
 
 
+@_slots
 @dataclass
 class SignalDef:
     signal_id: int
@@ -50,12 +72,21 @@ class SignalDef:
     length: int = 0
 
     def info(self, verbose=None) -> str:
-        strs = [f'{self.signal_id}: {self.name}']
-        if verbose:
-            for field in ['source_id', 'signal_type', 'data_type', 'sample_rate',
-                          'samples_per_data', 'sample_decimate_factor',
-                          'entries_per_summary', 'summary_decimate_factor',
-                          'annotation_decimate_factor', 'utc_decimate_factor',
-                          'units', 'length']:
-                strs.append(f'    {field}: {getattr(self, field)}')
-        return '\n'.join(strs)
+        hdr = f'{self.signal_id}: {self.name}'
+        if not verbose:
+            return hdr
+        return '\n'.join((
+            hdr,
+            f'    source_id: {self.source_id}',
+            f'    signal_type: {self.signal_type}',
+            f'    data_type: {self.data_type}',
+            f'    sample_rate: {self.sample_rate}',
+            f'    samples_per_data: {self.samples_per_data}',
+            f'    sample_decimate_factor: {self.sample_decimate_factor}',
+            f'    entries_per_summary: {self.entries_per_summary}',
+            f'    summary_decimate_factor: {self.summary_decimate_factor}',
+            f'    annotation_decimate_factor: {self.annotation_decimate_factor}',
+            f'    utc_decimate_factor: {self.utc_decimate_factor}',
+            f'    units: {self.units}',
+            f'    length: {self.length}',
+        ))
@@ -13,6 +13,8 @@
 # limitations under the License.
 
 from pyjls.binding import Writer, Reader, SummaryFSR, jls_inject_log
+from concurrent.futures import ThreadPoolExecutor
+import dataclasses
 import io
 import logging
 from logging import StreamHandler
@@ -20,18 +22,28 @@ import numpy as np
 import os
 import tempfile
 import unittest
-import numpy as np
 
 
 class TestBinding(unittest.TestCase):
 
+    @classmethod
+    def setUpClass(cls):
+        # prefer the Linux RAM-backed filesystem to avoid disk latency
+        shm = '/dev/shm'
+        cls._tmpdir = tempfile.TemporaryDirectory(dir=shm if os.path.isdir(shm) else None)
+        cls._data_f32 = np.arange(110000, dtype=np.float32)
+        cls._data_f32.setflags(write=False)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._tmpdir.cleanup()
+
     def setUp(self):
-        f = tempfile.NamedTemporaryFile(delete=False, suffix='.jls')
-        f.close()
-        self._path = f.name
+        self._path = os.path.join(self._tmpdir.name, f'{self._testMethodName}.jls')
         self.user_data = []
         self.annotations = []
         self._utc = []
+        self._utc_cache = None
 
     def _on_user_data(self, *args):
         self.user_data.append(args)
@@ -41,17 +53,19 @@ class TestBinding(unittest.TestCase):
 
     def _on_utc(self, entries):
         self._utc.append(entries)
+        self._utc_cache = None
 
     @property
     def utc(self):
-        return np.concatenate(self._utc)
-
-    def tearDown(self) -> None:
-        if os.path.isfile(self._path):
-            os.remove(self._path)
+        if self._utc_cache is None:
+            self._utc_cache = np.concatenate(self._utc)
+        return self._utc_cache
 
     def test_fsr_f32(self):
-        data = np.arange(110000, dtype=np.float32)
+        data = self._data_f32
+        e_mean = np.mean(data, dtype=np.float64)
+        e_std = np.std(data, ddof=1, dtype=np.float64)
+        e_min, e_max = data.min(), data.max()
         with Writer(self._path) as w:
             w.source_def(source_id=1, name='name', vendor='vendor', model='model',
                          version='version', serial_number='serial_number')
@@ -87,12 +101,160 @@ class TestBinding(unittest.TestCase):
             self.assertEqual(len(data), s.length)
 
             np.testing.assert_allclose(data, r.fsr(3, 0, len(data)))
-            e_std = np.std(data, dtype=np.float64) * (len(data) / (len(data) - 1))
+            buf = np.empty_like(data)
+            self.assertEqual(len(data), r.fsr_into(3, 0, buf))
+            np.testing.assert_allclose(data, buf)
             stats = r.fsr_statistics(3, 0, len(data), 1)
-            np.testing.assert_allclose(np.mean(data, dtype=np.float64), stats[0, SummaryFSR.MEAN])
-            np.testing.assert_allclose(np.min(data), stats[0, SummaryFSR.MIN])
-            np.testing.assert_allclose(np.max(data), stats[0, SummaryFSR.MAX])
-            np.testing.assert_allclose(e_std, stats[0, SummaryFSR.STD], rtol=1e-4)
+            np.testing.assert_allclose(e_mean, stats[0, SummaryFSR.MEAN])
+            np.testing.assert_allclose(e_min, stats[0, SummaryFSR.MIN])
+            np.testing.assert_allclose(e_max, stats[0, SummaryFSR.MAX])
+            np.testing.assert_allclose(e_std, stats[0, SummaryFSR.STD], rtol=1e-6)
+
+    def test_fsr_f32_buffer(self):
+        data = np.arange(1000, dtype=np.float32)
+        with Writer(self._path) as w:
+            w.source_def(source_id=1, name='name', vendor='vendor', model='model',
+                         version='version', serial_number='serial_number')
+            w.signal_def(3, source_id=1, sample_rate=1000000, name='current', units='A')
+            w.fsr_f32(3, 0, np.frombuffer(data[:500].tobytes(), dtype=np.float32))  # read-only
+            w.fsr_f32(3, 500, np.column_stack([data, data]).astype(np.float64)[500:, 0])  # strided float64
+        with Reader(self._path) as r:
+            np.testing.assert_equal(data, r.fsr(3, 0, len(data)))
+
+    def test_fsr_statistics_threads(self):
+        data = self._data_f32
+        with Writer(self._path) as w:
+            w.source_def(source_id=1, name='name', vendor='vendor', model='model',
+                         version='version', serial_number='serial_number')
+            w.signal_def(3, source_id=1, sample_rate=1000000, name='current', units='A')
+            w.fsr_f32(3, 0, data)
+        with Reader(self._path) as r:
+            expected = r.fsr_statistics(3, 0, 1000, 110)
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                futures = [executor.submit(r.fsr_statistics, 3, 0, 1000, 110) for _ in range(8)]
+                for future in futures:
+                    np.testing.assert_equal(expected, future.result())
+
+    def test_reader_threads(self):
+        data = self._data_f32
+        with Writer(self._path) as w:
+            w.source_def(source_id=1, name='name', vendor='vendor', model='model',
+                         version='version', serial_number='serial_number')
+            w.signal_def(3, source_id=1, sample_rate=1000000, name='current', units='A')
+            w.fsr_f32(3, 0, data)
+            for idx in range(500):
+                w.annotation(3, idx * 200, None, 0, 0, f'a{idx}')
+                w.utc(3, idx * 200, 1_600_000_000 + idx)
+        with Reader(self._path) as r:
+            def fsr():
+                return r.fsr(3, 0, len(data))
+
+            def fsr_into():
+                buf = np.empty_like(data)
+                r.fsr_into(3, 0, buf)
+                return buf
+
+            def annotations():
+                result = []
+                r.annotations(3, 0, lambda *args: result.append(args))
+                return len(result)
+
+            def utc():
+                result = []
+                r.utc(3, 0, result.append)
+                return len(np.concatenate(result))
+
+            expected = {fsr: data, fsr_into: data, annotations: 500, utc: 500}
+            fns = [fsr, fsr_into, annotations, utc] * 8
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                futures = [(fn, executor.submit(fn)) for fn in fns]
+                for fn, future in futures:
+                    np.testing.assert_equal(expected[fn], future.result())
+
+    def test_writer_closed(self):
+        with Writer(self._path) as w:
+            w.source_def(source_id=1, name='name', vendor='vendor', model='model',
+                         version='version', serial_number='serial_number')
+            w.signal_def(3, source_id=1, sample_rate=1000000, name='current', units='A')
+            w.fsr_f32(3, 0, self._data_f32)
+            w.close()  # explicit close inside the with block
+        w.close()
+        with self.assertRaises(RuntimeError):
+            w.fsr_f32(3, 0, self._data_f32)
+        with self.assertRaises(RuntimeError):
+            w.fsr_f32_from_f64(3, 0, np.zeros(10))
+        with self.assertRaises(RuntimeError):
+            w.user_data(1, b'closed')
+        with self.assertRaises(RuntimeError):
+            w.user_data_many([(1, b'closed')])
+        with self.assertRaises(RuntimeError):
+            w.annotation(3, 0, None, 0, 0, b'closed')
+        with self.assertRaises(RuntimeError):
+            w.flush()
+        with Reader(self._path) as r:
+            self.assertEqual(len(self._data_f32), r.signals[3].length)
+
+    def test_writer_threads(self):
+        with Writer(self._path) as w:
+            w.source_def(source_id=1, name='name', vendor='vendor', model='model',
+                         version='version', serial_number='serial_number')
+            w.signal_def(3, source_id=1, sample_rate=1000000, name='current', units='A')
+            w.fsr_f32(3, 0, self._data_f32)
+            with ThreadPoolExecutor(4) as pool:
+                futures = [pool.submit(w.fsr_f32, 3, len(self._data_f32), self._data_f32)]
+                futures += [pool.submit(w.user_data, i, b'thread') for i in range(100)]
+                futures.append(pool.submit(w.close))
+                for f in futures:
+                    try:
+                        f.result()
+                    except RuntimeError:
+                        pass  # closed
+        with Reader(self._path) as r:
+            self.assertIn(r.signals[3].length, [len(self._data_f32), 2 * len(self._data_f32)])
+
+    def test_reader_closed(self):
+        with Writer(self._path) as w:
+            w.source_def(source_id=1, name='name', vendor='vendor', model='model',
+                         version='version', serial_number='serial_number')
+            w.signal_def(3, source_id=1, sample_rate=1000000, name='current', units='A')
+            w.fsr_f32(3, 0, self._data_f32)
+        r = Reader(self._path)
+        r.close()
+        r.close()
+        with self.assertRaises(RuntimeError):
+            r.fsr(3, 0, 10)
+        with self.assertRaises(RuntimeError):
+            r.fsr_statistics(3, 0, 10, 1)
+        with self.assertRaises(RuntimeError):
+            r.annotations(3, 0, self._on_annotations)
+        with self.assertRaises(RuntimeError):
+            r.user_data_all()
+        with self.assertRaises(RuntimeError):
+            r.utc(3, 0, self._on_utc)
+
+    def test_fsr_f32_from_f64(self):
+        data = np.linspace(-1.0, 1.0, 110000, dtype=np.float64)
+        with Writer(self._path) as w:
+            w.source_def(source_id=1, name='name', vendor='vendor', model='model',
+                         version='version', serial_number='serial_number')
+            w.signal_def(3, source_id=1, sample_rate=1000000, name='current', units='A')
+            w.fsr_f32_from_f64(3, 0, data[:50000])
+            w.fsr_f32_from_f64(3, 50000, data[50000:])
+        with Reader(self._path) as r:
+            self.assertEqual(len(data), r.signals[3].length)
+            np.testing.assert_equal(data.astype(np.float32), r.fsr(3, 0, len(data)))
+
+    def test_fsr_f32_from_f64_blocks(self):
+        data = np.linspace(-1.0, 1.0, 200003, dtype=np.float64)  # several partial blocks
+        with Writer(self._path) as w:
+            w.source_def(source_id=1, name='name', vendor='vendor', model='model',
+                         version='version', serial_number='serial_number')
+            w.signal_def(3, source_id=1, sample_rate=1000000, name='current', units='A')
+            w.fsr_f32_from_f64(3, 0, data[:150001])
+            w.fsr_f32_from_f64(3, 150001, data[150001:].astype(np.float32))
+        with Reader(self._path) as r:
+            self.assertEqual(len(data), r.signals[3].length)
+            np.testing.assert_equal(data.astype(np.float32), r.fsr(3, 0, len(data)))
 
     def test_user_data(self):
         data = [
@@ -107,6 +269,74 @@ class TestBinding(unittest.TestCase):
             r.user_data(self._on_user_data)
         self.assertEqual(data, self.user_data)
 
+    def test_user_data_many(self):
+        data = [
+            (1, b'user binary'),
+            (2, 'user string'),
+            (3, {'user': 'json'}),
+            (4, b''),
+            (5, memoryview(np.arange(3, dtype=np.float32))),
+            (6, b'xyz'),
+        ]
+        with Writer(self._path) as w:
+            w.user_data_many(data)
+            w.user_data_many([])
+            for chunk_meta in [-1, 0x1000, 0x10000]:
+                with self.assertRaises(ValueError):
+                    w.user_data_many([(chunk_meta, b'invalid')])
+        data[4] = (5, np.arange(3, dtype=np.float32).tobytes())
+        with Reader(self._path) as r:
+            self.assertEqual(data, r.user_data_all())
+
+    def test_user_data_callback_exception(self):
+        with Writer(self._path) as w:
+            w.user_data_many([(1, b'a'), (2, b'b')])
+
+        def cbk(chunk_meta, data):
+            self.user_data.append((chunk_meta, data))
+            raise KeyError('user_data')
+
+        with Reader(self._path) as r:
+            with self.assertLogs('pyjls.binding', level='ERROR'):
+                r.user_data(cbk)
+        self.assertEqual([(1, b'a')], self.user_data)
+
+    def test_user_data_json_nonfinite(self):
+        with Writer(self._path) as w:
+            w.user_data(1, {'v': float('nan'), 'p': float('inf'), 'n': [float('-inf'), None]})
+        with Reader(self._path) as r:
+            chunk_meta, d = r.user_data_all()[0]
+        self.assertTrue(np.isnan(d['v']))
+        self.assertEqual(float('inf'), d['p'])
+        self.assertEqual([float('-inf'), None], d['n'])
+
+    def test_user_data_json_big_int(self):
+        data = {'a': 2**70, 'b': 12345678901234567890123, 'c': -2**63 - 1}
+        with Writer(self._path) as w:
+            w.user_data(1, data)
+        with Reader(self._path) as r:
+            self.assertEqual([(1, data)], r.user_data_all())
+
+    def test_user_data_json_unsupported(self):
+        @dataclasses.dataclass
+        class Point:
+            x: float = float('nan')
+
+        with Writer(self._path) as w:
+            for d in [Point(), np.float32(1.0), {'v': np.arange(2)}]:
+                with self.assertRaises(TypeError):
+                    w.user_data(1, d)
+
+    def test_user_data_bytes_like(self):
+        with Writer(self._path) as w:
+            w.user_data(1, bytearray(b'user bytearray'))
+            w.user_data(2, memoryview(b'user memoryview'))
+            w.user_data(3, memoryview(np.arange(3, dtype=np.float32)))
+        with Reader(self._path) as r:
+            r.user_data(self._on_user_data)
+        f32 = np.arange(3, dtype=np.float32).tobytes()
+        self.assertEqual([(1, b'user bytearray'), (2, b'user memoryview'), (3, f32)], self.user_data)
+
     def _annotation_gen(self, signal_id):
         annotations = [
             (0, 2.0,  3, 23, '2'),
@@ -130,6 +360,41 @@ class TestBinding(unittest.TestCase):
             r.annotations(signal_id, 0, self._on_annotations)
         self.assertEqual(expected, self.annotations)
 
+    def test_annotation_memoryview(self):
+        signal_id = 3
+        data = np.arange(3, dtype=np.float32)
+        with Writer(self._path) as w:
+            w.source_def(source_id=1, name='name', vendor='vendor', model='model',
+                         version='version', serial_number='serial_number')
+            w.signal_def(signal_id=signal_id, source_id=1, sample_rate=1000, name='current', units='A')
+            w.annotation(signal_id, 5, None, 0, 0, memoryview(data))
+        with Reader(self._path) as r:
+            r.annotations(signal_id, 0, self._on_annotations)
+        self.assertEqual([(5, None, 0, 0, data.tobytes())], self.annotations)
+
+    def test_annotation_batch(self):
+        signal_id = 3
+        expected = self._annotation_gen(signal_id)
+        batches = []
+        with Reader(self._path) as r:
+            r.annotations_bulk(signal_id, 0, batches.append, batch_size=3)
+        self.assertEqual([3, 1], [len(b) for b in batches])
+        for batch in batches:
+            self.annotations.extend(batch)
+        self.assertEqual(expected, self.annotations)
+
+    def test_annotation_batch_exception(self):
+        signal_id = 3
+        self._annotation_gen(signal_id)
+
+        def cbk(batch):
+            raise KeyError('batch')
+
+        with Reader(self._path) as r:
+            for batch_size in [3, 10]:  # in-loop and remainder batches
+                with self.assertRaises(KeyError):
+                    r.annotations_bulk(signal_id, 0, cbk, batch_size=batch_size)
+
     def test_annotation_seek(self):
         signal_id = 3
         expected = self._annotation_gen(signal_id)
@@ -137,21 +402,68 @@ class TestBinding(unittest.TestCase):
             r.annotations(signal_id, expected[2][0], self._on_annotations)
         self.assertEqual(expected[2:], self.annotations)
 
+    def test_annotation_bytes_like(self):
+        signal_id = 3
+        with Writer(self._path) as w:
+            w.source_def(source_id=1, name='name', vendor='vendor', model='model',
+                         version='version', serial_number='serial_number')
+            w.signal_def(signal_id=signal_id, source_id=1, sample_rate=1000000, name='current', units='A')
+            w.annotation(signal_id, 0, None, 0, 20, bytearray(b'bytearray'))
+            w.annotation(signal_id, 1, None, 0, 21, memoryview(b'memoryview'))
+        with Reader(self._path) as r:
+            r.annotations(signal_id, 0, self._on_annotations)
+        self.assertEqual([(0, None, 0, 20, b'bytearray'), (1, None, 0, 21, b'memoryview')], self.annotations)
+
+    def test_annotations_bulk(self):
+        signal_id = 3
+        payloads = [b'', b'a', b'bc', b'def']
+        timestamps = np.array([0, 10, 11, 12], dtype=np.int64)
+        annotation_types = np.array([0, 0, 2, 3], dtype=np.uint8)
+        group_ids = np.array([20, 21, 22, 23], dtype=np.uint8)
+        offsets = np.cumsum([0] + [len(p) for p in payloads])
+        with Writer(self._path) as w:
+            w.source_def(source_id=1, name='name', vendor='vendor', model='model',
+                         version='version', serial_number='serial_number')
+            w.signal_def(signal_id=signal_id, source_id=1, sample_rate=1000000, name='current', units='A')
+            w.annotations_bulk(signal_id, timestamps, annotation_types, group_ids, b''.join(payloads), offsets)
+            with self.assertRaises(ValueError):
+                w.annotations_bulk(signal_id, timestamps, annotation_types, group_ids, b'', offsets)
+        with Reader(self._path) as r:
+            r.annotations(signal_id, 0, self._on_annotations)
+        expected = [(int(t), None, int(a), int(g), p)
+                    for t, a, g, p in zip(timestamps, annotation_types, group_ids, payloads)]
+        self.assertEqual(expected, self.annotations)
+
+    def test_annotations_bulk_readonly_vsr(self):
+        signal_id = 0  # VSR
+        payloads = [b'a', b'bc']
+        timestamps = np.array([1_600_000_000, 1_600_000_001], dtype=np.int64)
+        annotation_types = np.array([0, 0], dtype=np.uint8)
+        group_ids = np.array([0, 1], dtype=np.uint8)
+        offsets = np.array([0, 1, 3], dtype=np.int64)
+        for x in [timestamps, annotation_types, group_ids, offsets]:
+            x.setflags(write=False)
+        with Writer(self._path) as w:
+            w.annotations_bulk(signal_id, timestamps, annotation_types, group_ids, b''.join(payloads), offsets)
+            w.annotation(signal_id, 1_600_000_002, None, 0, 2, b'def')
+        with Reader(self._path) as r:
+            r.annotations(signal_id, 0, self._on_annotations)
+        self.assertEqual([1_600_000_000, 1_600_000_001, 1_600_000_002], [a[0] for a in self.annotations])
+        self.assertEqual([b'a', b'bc', b'def'], [a[4] for a in self.annotations])
+
     def _utc_gen(self, signal_id):
         signal_id = 3
-        data = []
+        fs = 1000000
+        timestamps = np.arange(100, dtype=np.int64)  # in seconds
+        data = np.column_stack([timestamps * fs, timestamps])
         with Writer(self._path) as w:
-            fs = 1000000
             w.source_def(source_id=1, name='name', vendor='vendor', model='model',
                          version='version', serial_number='serial_number')
             w.signal_def(signal_id=signal_id, source_id=1, sample_rate=fs, name='current', units='A')
             w.fsr_f32(3, 0, np.array([1, 2, 3, 4], dtype=np.float32))
-            for entry in range(100):
-                sample_id = entry * fs
-                timestamp = entry  # in seconds
-                data.append([sample_id, timestamp])
-                w.utc(signal_id, entry * fs, entry)
-        return np.array(data, dtype=np.int64)
+            for sample_id, timestamp in data:
+                w.utc(signal_id, sample_id, timestamp)
+        return data
 
     def test_utc(self):
         signal_id = 3
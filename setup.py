@@ -23,22 +23,24 @@ Joulescope file format python setuptools module.
 
 # Always prefer setuptools over distutils
 import setuptools
-import setuptools.dist
-import distutils.cmd
-from distutils.errors import DistutilsExecError
+from setuptools.command.build_clib import build_clib
+from setuptools.command.build_ext import build_ext
+from setuptools.errors import ExecError
+from concurrent.futures import ThreadPoolExecutor
 import os
 import platform
+import shlex
+import shutil
+import subprocess
 import sys
+import sysconfig
 
 if platform.system() == 'Windows':
+    # https://developercommunity.visualstudio.com/content/problem/1207405/fmod-after-an-update-to-windows-2004-is-causing-a.html
     numpy_req = 'numpy>=1.20'
 else:
     numpy_req = 'numpy>=1.16'
 
-setuptools.dist.Distribution().fetch_build_eggs(['Cython>=0.29.3', numpy_req])
-
-import numpy as np
-
 
 MYPATH = os.path.dirname(os.path.abspath(__file__))
 VERSION_PATH = os.path.join(MYPATH, 'pyjls', 'version.py')
@@ -56,49 +58,126 @@ with open(VERSION_PATH, 'r', encoding='utf-8') as f:
     exec(f.read(), about)
 
 
-if platform.system() == 'Windows':
-    sources = ['src/backend_win.c', 'src/crc32c_intel_sse4.c']
+def _lto_args():
+    """Get the link-time optimization compile args, link args and archiver.
+
+    The C library is a static archive made by build_clib, and plain ar
+    cannot index the slim LTO objects that GCC and Clang emit by
+    default.  GCC emits fat objects, which also contain regular code.
+    Clang needs llvm-ar, except on macOS where the system ar
+    understands LTO objects.  Set PYJLS_LTO=0 to disable.
+    """
+    if os.environ.get('PYJLS_LTO', '1') in ('', '0'):
+        return [], [], None
+    cc = os.environ.get('CC') or sysconfig.get_config_var('CC') or 'cc'
+    try:
+        version = subprocess.run(shlex.split(cc) + ['--version'], capture_output=True, text=True).stdout
+    except OSError:
+        return [], [], None
+    if 'clang' not in version:
+        if 'Free Software Foundation' in version:  # GCC
+            return ['-flto=auto', '-ffat-lto-objects'], ['-flto=auto'], None
+        return [], [], None
+    if platform.system() == 'Darwin':
+        return ['-flto'], ['-flto'], None
+    archiver = shutil.which('llvm-ar')
+    if archiver is None:
+        return [], [], None
+    return ['-flto'], ['-flto'], archiver
+
+
+LTO_ARCHIVER = None
+
+
+if platform.system() == 'Windows' and platform.machine() == 'ARM64':
+    sources = ['src/backend_win.c', 'src/crc32c_arm_neon.c']
+    libraries = []
+    extra_compile_args = []
+elif platform.system() == 'Windows':
+    sources = ['src/backend_win.c', 'src/crc32c_intel_sse4.c', 'src/crc32c_sw.c']
     libraries = []
     extra_compile_args = []
 elif 'armv7' in platform.machine():
     sources = ['src/backend_posix.c', 'src/crc32c_sw.c']
     libraries = ['pthread', 'm']
     extra_compile_args = []
-elif platform.processor() == 'aarch64' or platform.machine() == 'arm64':
+elif platform.machine() in ('aarch64', 'arm64'):
     sources = ['src/backend_posix.c', 'src/crc32c_arm_neon.c']
     libraries = ['pthread', 'm']
     extra_compile_args = ['-march=armv8-a+crc+simd']
-else:
-    sources = ['src/backend_posix.c', 'src/crc32c_intel_sse4.c']
+elif platform.machine().lower() in ('x86_64', 'amd64', 'i386', 'i686'):
+    sources = ['src/backend_posix.c', 'src/crc32c_intel_sse4.c', 'src/crc32c_sw.c']
     libraries = ['pthread', 'm']
-    extra_compile_args = ['-msse4']
+    extra_compile_args = []
+else:  # other architectures, such as riscv64, use the portable software CRC
+    sources = ['src/backend_posix.c', 'src/crc32c_sw.c']
+    libraries = ['pthread', 'm']
+    extra_compile_args = []
 
+if platform.system() == 'Windows':
+    opt_compile_args = ['/O2', '/GL']
+    opt_link_args = ['/LTCG']
+    lib_compile_args = []
+else:
+    opt_compile_args = ['-O3', '-fno-math-errno']
+    opt_link_args = ['-O3']
+    # Only PyInit_binding needs to be exported from the extension.
+    lib_compile_args = ['-fvisibility=hidden']
+    lto_compile_args, lto_link_args, LTO_ARCHIVER = _lto_args()
+    opt_compile_args += lto_compile_args
+    opt_link_args += lto_link_args
+    # Opt-in CPU targets for local or dedicated builds, not portable wheels:
+    #   PYJLS_NATIVE=1          the build machine's CPU
+    #   PYJLS_MARCH=x86-64-v3   a specific -march, such as x86-64-v3 for AVX2
+    if os.environ.get('PYJLS_NATIVE', '0') not in ('', '0'):
+        opt_compile_args += ['-march=native', '-mtune=native']
+    elif os.environ.get('PYJLS_MARCH'):
+        march = os.environ['PYJLS_MARCH']
+        opt_compile_args += [f'-march={march}']
+
+
+# Build the C library once as a static library, like the CMake build,
+# so that binding changes do not recompile it.
+jls_library = ('jls', {
+    'sources': [
+        'src/ec.c',
+        'src/log.c',
+        'src/msg_ring_buffer.c',
+        'src/raw.c',
+        'src/reader.c',
+        'src/statistics.c',
+        'src/threaded_writer.c',
+        'src/wf_f32.c',
+        'src/wr_ts.c',
+        'src/writer.c',
+    ] + sources,
+    'include_dirs': ['include', 'include_prv'],
+    'cflags': extra_compile_args + opt_compile_args + lib_compile_args,
+})
 
 ext = '.pyx' if USE_CYTHON else '.c'
 extensions = [
     setuptools.Extension('pyjls.binding',
-        sources=[
-            'pyjls/binding' + ext,
-            'src/ec.c',
-            'src/log.c',
-            'src/msg_ring_buffer.c',
-            'src/raw.c',
-            'src/reader.c',
-            'src/statistics.c',
-            'src/threaded_writer.c',
-            'src/wf_f32.c',
-            'src/wr_ts.c',
-            'src/writer.c',
-        ] + sources,
-        include_dirs=['include', 'include_prv', np.get_include()],
-        libraries = libraries,
-        extra_compile_args=[] + extra_compile_args,
+        sources=['pyjls/binding' + ext],
+        include_dirs=['include', 'include_prv'],
+        define_macros=[('NPY_NO_DEPRECATED_API', 'NPY_1_7_API_VERSION')],
+        libraries=libraries,  # build_clib adds jls
+        extra_compile_args=extra_compile_args + opt_compile_args,
+        extra_link_args=opt_link_args,
     ),
 ]
 
 if USE_CYTHON:
     from Cython.Build import cythonize
-    extensions = cythonize(extensions, compiler_directives={'language_level': '3'})  # , annotate=True)
+    # PYJLS_ANNOTATE=1 writes pyjls/binding.html to find Python overhead
+    extensions = cythonize(extensions, compiler_directives={
+        'language_level': '3',
+        'boundscheck': False,
+        'wraparound': False,
+        'initializedcheck': False,
+        'nonecheck': False,
+        'cdivision': True,
+    }, annotate=os.environ.get('PYJLS_ANNOTATE', '0') not in ('', '0'))
 
 
 # Get the long description from the README file
@@ -112,7 +191,71 @@ if sys.platform.startswith('win'):
     PLATFORM_INSTALL_REQUIRES = []
 
 
-class CustomBuildDocs(distutils.cmd.Command):
+class CustomBuildClib(build_clib):
+    """Compile the C library sources in parallel and honor --force.
+
+    build_clib otherwise compiles one source at a time and ignores
+    --force for up-to-date objects.
+    """
+
+    user_options = build_clib.user_options + [
+        ('parallel=', 'j', 'number of parallel compile jobs, default is the CPU count'),
+    ]
+
+    def initialize_options(self):
+        super().initialize_options()
+        self.parallel = None
+
+    def finalize_options(self):
+        super().finalize_options()
+        self.parallel = max(1, int(self.parallel or os.cpu_count() or 1))
+
+    def build_libraries(self, libraries):
+        if self.force:
+            for _, build_info in libraries:
+                for obj in self.compiler.object_filenames(build_info['sources'], output_dir=self.build_temp):
+                    if os.path.isfile(obj):
+                        os.remove(obj)
+        if LTO_ARCHIVER:
+            self.compiler.set_executable('archiver', [LTO_ARCHIVER, '-cr'])
+        if not getattr(self.compiler, 'initialized', True):
+            self.compiler.initialize()  # MSVC, before the worker threads
+        compile_serial = self.compiler.compile
+
+        def compile_parallel(sources, **kwargs):
+            with ThreadPoolExecutor(self.parallel) as pool:
+                objects = pool.map(lambda source: compile_serial([source], **kwargs), sources)
+                return [obj for objs in objects for obj in objs]
+
+        self.compiler.compile = compile_parallel
+        try:
+            super().build_libraries(libraries)
+        finally:
+            del self.compiler.compile
+
+
+class CustomBuildExt(build_ext):
+    """Add the numpy include directory and build the C library first."""
+
+    def finalize_options(self):
+        super().finalize_options()
+        import numpy as np
+        self.include_dirs.append(np.get_include())
+
+    def run(self):
+        # build_ext --inplace does not run build_clib by itself
+        clib = self.get_finalized_command('build_clib')
+        clib.force = clib.force or self.force
+        if self.parallel:
+            clib.parallel = int(self.parallel)  # build_ext --parallel / -j
+        self.run_command('build_clib')
+        lib_path = clib.compiler.library_filename('jls', output_dir=clib.build_clib)
+        for ext in self.extensions:
+            ext.depends.append(lib_path)  # relink when the C library changes
+        super().run()
+
+
+class CustomBuildDocs(setuptools.Command):
     """Custom command to build docs locally."""
 
     description = 'Build docs.'
@@ -133,10 +276,11 @@ class CustomBuildDocs(distutils.cmd.Command):
         source_dir = os.path.join(MYPATH, 'docs')
         target_dir = os.path.join(MYPATH, 'build', 'docs_html')
         doctree_dir = os.path.join(target_dir, '.doctree')
-        app = Sphinx(source_dir, source_dir, target_dir, doctree_dir, 'html')
+        app = Sphinx(source_dir, source_dir, target_dir, doctree_dir, 'html',
+                     parallel=os.cpu_count() or 1)
         app.build()
         if app.statuscode:
-            raise DistutilsExecError(
+            raise ExecError(
                 'caused by %s builder.' % app.builder.name)
 
 
@@ -190,7 +334,10 @@ setuptools.setup(
 
     packages=setuptools.find_packages(exclude=['native', 'docs', 'test', 'dist', 'build']),
     ext_modules=extensions,
+    libraries=[jls_library],
     cmdclass={
+        'build_clib': CustomBuildClib,
+        'build_ext': CustomBuildExt,
         'docs': CustomBuildDocs,
     },
     include_dirs=[],
@@ -198,12 +345,6 @@ setuptools.setup(
     # See https://packaging.python.org/guides/distributing-packages-using-setuptools/#python-requires
     python_requires='~=3.7',
 
-    setup_requires=[
-        # https://developercommunity.visualstudio.com/content/problem/1207405/fmod-after-an-update-to-windows-2004-is-causing-a.html
-        numpy_req,
-        'Cython>=0.29.3',
-    ],
-
     # See https://packaging.python.org/en/latest/requirements.html
     install_requires=[
         numpy_req,
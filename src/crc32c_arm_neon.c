@@ -15,11 +15,15 @@
  */
 
 #include "jls/crc32c.h"
+#if defined(_MSC_VER)
+#include <intrin.h>  // __crc32c* for Windows on ARM64
+#else
 #include <arm_acle.h>
 #include <arm_neon.h>
+#endif
 #include <assert.h>
 
-// Used by Raspberry Pi 4 and new M1 Macs.
+// Used by Raspberry Pi 4, new M1 Macs and Windows on ARM64.
 // See https://github.com/google/crc32c/blob/master/src/crc32c_arm64.cc
 // Generic software implementation by Mark Adler: https://stackoverflow.com/a/17646775/888653
 
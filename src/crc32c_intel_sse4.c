@@ -20,7 +20,15 @@
 // https://software.intel.com/sites/landingpage/IntrinsicsGuide/#text=crc&expand=1288
 // Could consider https://github.com/htot/crc32c/blob/master/crc32c/crc_iscsi_v_pcl.asm
 
-uint32_t jls_crc32c_hdr(const struct jls_chunk_header_s * hdr) {
+// Only called when the CPU supports SSE4.2, see the dispatch in crc32c_sw.c.
+#if defined(__GNUC__) || defined(__clang__)
+#define JLS_TARGET_SSE42 __attribute__((target("sse4.2")))
+#else
+#define JLS_TARGET_SSE42
+#endif
+
+JLS_TARGET_SSE42
+uint32_t jls_crc32c_hdr_sse42(const struct jls_chunk_header_s * hdr) {
     uint32_t crc32;
 #if defined(__x86_64__) || defined(_M_X64)
     uint64_t crc64;
@@ -44,7 +52,8 @@ uint32_t jls_crc32c_hdr(const struct jls_chunk_header_s * hdr) {
     return (crc32 ^ 0xFFFFFFFF);
 }
 
-uint32_t jls_crc32c(uint8_t const *data, uint32_t length) {
+JLS_TARGET_SSE42
+uint32_t jls_crc32c_sse42(uint8_t const *data, uint32_t length) {
     uint32_t crc = 0xFFFFFFFF;
     for (; ((length > 0) && (0x7 & (intptr_t) data)); ++data, --length) {
         crc = _mm_crc32_u8(crc, *data);
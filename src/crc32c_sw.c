@@ -529,14 +529,91 @@ static uint32_t crc32cSlicingBy8(uint32_t crc, const void* data, size_t length)
     return crc;
 }
 
-uint32_t jls_crc32c_hdr(const struct jls_chunk_header_s * hdr) {
+uint32_t jls_crc32c_hdr_sw(const struct jls_chunk_header_s * hdr) {
     uint32_t crc = 0xFFFFFFFF;
     crc = crc32cSlicingBy8(crc, (unsigned const char*) hdr, 28);
     return (crc ^ 0xFFFFFFFF);
 }
 
-uint32_t jls_crc32c(uint8_t const *data, uint32_t length) {
+uint32_t jls_crc32c_sw(uint8_t const *data, uint32_t length) {
     uint32_t crc = 0xFFFFFFFF;
     crc = crc32cSlicingBy8(crc, data, length);
     return (crc ^ 0xFFFFFFFF);
 }
+
+#if defined(__x86_64__) || defined(_M_X64) || defined(__i386__) || defined(_M_IX86)
+
+/*
+ * On x86, select the SSE4.2 implementation in crc32c_intel_sse4.c at
+ * runtime so that the same binary works on CPUs without SSE4.2.
+ * The first call resolves the function pointer.  Concurrent first
+ * calls all store the same value.
+ */
+
+#if defined(_MSC_VER)
+#include <intrin.h>
+#else
+#include <cpuid.h>
+#endif
+
+uint32_t jls_crc32c_hdr_sse42(const struct jls_chunk_header_s * hdr);
+uint32_t jls_crc32c_sse42(uint8_t const *data, uint32_t length);
+
+static int has_sse42(void) {
+#if defined(_MSC_VER)
+    int info[4];
+    __cpuid(info, 1);
+    return (info[2] >> 20) & 1;
+#else
+    unsigned int eax, ebx, ecx, edx;
+    if (!__get_cpuid(1, &eax, &ebx, &ecx, &edx)) {
+        return 0;
+    }
+    return (ecx & bit_SSE4_2) ? 1 : 0;
+#endif
+}
+
+static uint32_t crc32c_hdr_resolve(const struct jls_chunk_header_s * hdr);
+static uint32_t crc32c_resolve(uint8_t const *data, uint32_t length);
+static uint32_t (*crc32c_hdr_fn)(const struct jls_chunk_header_s * hdr) = crc32c_hdr_resolve;
+static uint32_t (*crc32c_fn)(uint8_t const *data, uint32_t length) = crc32c_resolve;
+
+static void crc32c_select(void) {
+    if (has_sse42()) {
+        crc32c_hdr_fn = jls_crc32c_hdr_sse42;
+        crc32c_fn = jls_crc32c_sse42;
+    } else {
+        crc32c_hdr_fn = jls_crc32c_hdr_sw;
+        crc32c_fn = jls_crc32c_sw;
+    }
+}
+
+static uint32_t crc32c_hdr_resolve(const struct jls_chunk_header_s * hdr) {
+    crc32c_select();
+    return crc32c_hdr_fn(hdr);
+}
+
+static uint32_t crc32c_resolve(uint8_t const *data, uint32_t length) {
+    crc32c_select();
+    return crc32c_fn(data, length);
+}
+
+uint32_t jls_crc32c_hdr(const struct jls_chunk_header_s * hdr) {
+    return crc32c_hdr_fn(hdr);
+}
+
+uint32_t jls_crc32c(uint8_t const *data, uint32_t length) {
+    return crc32c_fn(data, length);
+}
+
+#else
+
+uint32_t jls_crc32c_hdr(const struct jls_chunk_header_s * hdr) {
+    return jls_crc32c_hdr_sw(hdr);
+}
+
+uint32_t jls_crc32c(uint8_t const *data, uint32_t length) {
+    return jls_crc32c_sw(data, length);
+}
+
+#endif
@@ -30,6 +30,7 @@
 
 
 #define CHUNK_BUFFER_SIZE  (1 << 24)
+#define WRITE_BUFFER_SIZE  (1 << 20)
 static const uint8_t FILE_HDR[] = JLS_HEADER_IDENTIFICATION;
 
 #define ROE(x)  do {                        \
@@ -53,6 +54,9 @@ struct jls_raw_s {
     int64_t offset;                 // the offset for the current chunk
     uint8_t write_en;
     union jls_version_u version;
+    uint8_t * wr_buf;               // write-back buffer, NULL when not writing.
+    int64_t wr_buf_offset;          // the file offset for wr_buf[0].
+    uint32_t wr_buf_size;           // the number of valid bytes in wr_buf.
 };
 
 static inline void invalidate_current_chunk(struct jls_raw_s * self) {
@@ -70,12 +74,116 @@ static inline uint32_t payload_size_on_disk(uint32_t payload_size) {
     return payload_size + pad + 4;
 }
 
+/*
+ * When writing, small chunk writes are coalesced into wr_buf.  The backend
+ * fpos and fend then track the logical file position and size, and the
+ * OS file position is only set when the buffer is written to disk.  Seeks
+ * remain logical, so rewriting a recent chunk header only updates wr_buf.
+ */
+
+static int32_t wr_buf_flush(struct jls_raw_s * self) {
+    if (!self->wr_buf_size) {
+        return 0;
+    }
+    int64_t pos = self->backend.fpos;
+    int64_t end = self->backend.fend;
+    int32_t rc = jls_bk_fseek(&self->backend, self->wr_buf_offset, SEEK_SET);
+    if (!rc) {
+        rc = jls_bk_fwrite(&self->backend, self->wr_buf, self->wr_buf_size);
+    }
+    if (!rc) {
+        self->wr_buf_size = 0;  // on error, keep wr_buf so that a later flush can retry
+    }
+    self->backend.fpos = pos;
+    self->backend.fend = end;
+    return rc;
+}
+
+static int32_t wr_buf_sync(struct jls_raw_s * self) {
+    if (!self->wr_buf) {
+        return 0;
+    }
+    ROE(wr_buf_flush(self));
+    return jls_bk_fseek(&self->backend, self->backend.fpos, SEEK_SET);
+}
+
+static int32_t bk_write(struct jls_raw_s * self, const void * buffer, uint32_t count) {
+    if (!self->wr_buf) {
+        return jls_bk_fwrite(&self->backend, buffer, count);
+    }
+    int64_t pos = self->backend.fpos;
+    if (self->wr_buf_size && ((pos < self->wr_buf_offset)
+            || (pos > (self->wr_buf_offset + self->wr_buf_size))
+            || ((pos - self->wr_buf_offset + count) > WRITE_BUFFER_SIZE))) {
+        ROE(wr_buf_flush(self));
+    }
+    if (count >= WRITE_BUFFER_SIZE) {
+        ROE(wr_buf_sync(self));
+        return jls_bk_fwrite(&self->backend, buffer, count);
+    }
+    if (!self->wr_buf_size) {
+        self->wr_buf_offset = pos;
+    }
+    uint32_t idx = (uint32_t) (pos - self->wr_buf_offset);
+    memcpy(self->wr_buf + idx, buffer, count);
+    if ((idx + count) > self->wr_buf_size) {
+        self->wr_buf_size = idx + count;
+    }
+    self->backend.fpos += count;
+    if (self->backend.fpos > self->backend.fend) {
+        self->backend.fend = self->backend.fpos;
+    }
+    return 0;
+}
+
+static int32_t bk_read(struct jls_raw_s * self, void * const buffer, uint32_t buffer_size) {
+    ROE(wr_buf_sync(self));
+    return jls_bk_fread(&self->backend, buffer, buffer_size);
+}
+
+static int32_t bk_seek(struct jls_raw_s * self, int64_t offset, int origin) {
+    if (!self->wr_buf) {
+        return jls_bk_fseek(&self->backend, offset, origin);
+    }
+    switch (origin) {
+        case SEEK_SET: self->backend.fpos = offset; break;
+        case SEEK_CUR: self->backend.fpos += offset; break;
+        case SEEK_END: self->backend.fpos = self->backend.fend + offset; break;
+        default: return JLS_ERROR_PARAMETER_INVALID;
+    }
+    return 0;
+}
+
+static int64_t bk_tell(struct jls_raw_s * self) {
+    if (!self->wr_buf) {
+        return jls_bk_ftell(&self->backend);
+    }
+    return self->backend.fpos;
+}
+
+static int32_t wr_buf_alloc(struct jls_raw_s * self) {
+    self->wr_buf = malloc(WRITE_BUFFER_SIZE);
+    if (!self->wr_buf) {
+        return JLS_ERROR_NOT_ENOUGH_MEMORY;
+    }
+    self->wr_buf_offset = self->backend.fpos;
+    self->wr_buf_size = 0;
+    return 0;
+}
+
+static void wr_buf_free(struct jls_raw_s * self) {
+    if (self->wr_buf) {
+        free(self->wr_buf);
+        self->wr_buf = NULL;
+    }
+}
+
 static int32_t wr_file_header(struct jls_raw_s * self) {
     int32_t rc = 0;
-    int64_t pos = jls_bk_ftell(&self->backend);
-    jls_bk_fseek(&self->backend, 0L, SEEK_END);
-    int64_t file_sz = jls_bk_ftell(&self->backend);
-    jls_bk_fseek(&self->backend, 0L, SEEK_SET);
+    int64_t pos = bk_tell(self);
+    bk_seek(self, 0L, SEEK_END);
+    int64_t file_sz = bk_tell(self);
+    bk_seek(self, 0L, SEEK_SET);
 
     struct jls_file_header_s hdr = {
             .identification = JLS_HEADER_IDENTIFICATION,
@@ -84,9 +192,9 @@ static int32_t wr_file_header(struct jls_raw_s * self) {
             .crc32 = 0,
     };
     hdr.crc32 = jls_crc32c((uint8_t *) &hdr, sizeof(hdr) - 4);
-    RLE(jls_bk_fwrite(&self->backend, &hdr, sizeof(hdr)));
+    RLE(bk_write(self, &hdr, sizeof(hdr)));
     if (pos != 0) {
-        jls_bk_fseek(&self->backend, pos, SEEK_SET);
+        bk_seek(self, pos, SEEK_SET);
     } else {
         self->offset = self->backend.fpos;
     }
@@ -165,7 +273,10 @@ int32_t jls_raw_open(struct jls_raw_s ** instance, const char * path, const char
     switch (mode[0]) {
         case 'w':
             self->write_en = 1;
-            rc = wr_file_header(self);
+            rc = wr_buf_alloc(self);
+            if (!rc) {
+                rc = wr_file_header(self);
+            }
             self->offset = self->backend.fpos;
             self->version.u32 = JLS_FORMAT_VERSION_U32;
             break;
@@ -182,6 +293,7 @@ int32_t jls_raw_open(struct jls_raw_s ** instance, const char * path, const char
                 rc = JLS_ERROR_IO;
             } else {
                 self->offset = self->backend.fpos;
+                rc = wr_buf_alloc(self);
             }
             break;
         default:
@@ -190,6 +302,7 @@ int32_t jls_raw_open(struct jls_raw_s ** instance, const char * path, const char
 
     if (rc) {
         jls_bk_fclose(&self->backend);
+        wr_buf_free(self);
         free(self);
     } else {
         *instance = self;
@@ -201,8 +314,12 @@ int32_t jls_raw_close(struct jls_raw_s * self) {
     if (self) {
         if ((self->backend.fd != -1) && (self->write_en)) {
             wr_file_header(self);
+            if (wr_buf_flush(self)) {
+                JLS_LOGE("write buffer flush failed on close");
+            }
         }
         jls_bk_fclose(&self->backend);
+        wr_buf_free(self);
         free(self);
     }
     return 0;
@@ -225,9 +342,9 @@ int32_t jls_raw_wr_header(struct jls_raw_s * self, struct jls_chunk_header_s * h
     hdr->crc32 = jls_crc32c_hdr(hdr);
     if (self->offset != self->backend.fpos) {
         invalidate_current_chunk(self);
-        RLE(jls_bk_fseek(&self->backend, self->offset, SEEK_SET));
+        RLE(bk_seek(self, self->offset, SEEK_SET));
     }
-    if (jls_bk_fwrite(&self->backend, hdr, sizeof(*hdr))) {
+    if (bk_write(self, hdr, sizeof(*hdr))) {
         return JLS_ERROR_IO;
     }
     self->hdr = *hdr;
@@ -260,8 +377,8 @@ int32_t jls_raw_wr_payload(struct jls_raw_s * self, uint32_t payload_length, con
     footer[pad + 2] = (crc32 >> 16) & 0xff;
     footer[pad + 3] = (crc32 >> 24) & 0xff;
 
-    RLE(jls_bk_fwrite(&self->backend, payload, hdr->payload_length));
-    return jls_bk_fwrite(&self->backend, footer, pad + 4);
+    RLE(bk_write(self, payload, hdr->payload_length));
+    return bk_write(self, footer, pad + 4);
 }
 
 int32_t jls_raw_rd(struct jls_raw_s * self, struct jls_chunk_header_s * hdr, uint32_t payload_length_max, uint8_t * payload) {
@@ -285,14 +402,14 @@ int32_t jls_raw_rd_header(struct jls_raw_s * self, struct jls_chunk_header_s * h
             return JLS_ERROR_EMPTY;
         }
         if (self->offset != self->backend.fpos) {
-            if (jls_bk_fseek(&self->backend, self->offset, SEEK_SET)) {
+            if (bk_seek(self, self->offset, SEEK_SET)) {
                 JLS_LOGE("seek failed");
                 invalidate_current_chunk(self);
                 return JLS_ERROR_IO;
             }
         }
         self->offset = self->backend.fpos;
-        if (jls_bk_fread(&self->backend, (uint8_t *) h, sizeof(*h))) {
+        if (bk_read(self, (uint8_t *) h, sizeof(*h))) {
             invalidate_current_chunk(self);
             return JLS_ERROR_EMPTY;
         }
@@ -328,11 +445,11 @@ int32_t jls_raw_rd_payload(struct jls_raw_s * self, uint32_t payload_length_max,
 
     int64_t pos = self->offset + sizeof(struct jls_chunk_header_s);
     if (pos != self->backend.fpos) {
-        jls_bk_fseek(&self->backend, pos, SEEK_SET);
+        bk_seek(self, pos, SEEK_SET);
         self->backend.fpos = pos;
     }
 
-    RLE(jls_bk_fread(&self->backend, (uint8_t *) payload, rd_size));
+    RLE(bk_read(self, (uint8_t *) payload, rd_size));
     crc32_calc = jls_crc32c(payload, hdr->payload_length);
     crc32_file = ((uint32_t)payload[rd_size - 4])
         | (((uint32_t)payload[rd_size - 3]) << 8)
@@ -351,7 +468,7 @@ int32_t jls_raw_chunk_seek(struct jls_raw_s * self, int64_t offset) {
         JLS_LOGW("seek to 0");
         return JLS_ERROR_IO;
     }
-    if (jls_bk_fseek(&self->backend, offset, SEEK_SET)) {
+    if (bk_seek(self, offset, SEEK_SET)) {
         return JLS_ERROR_IO;
     }
     self->offset = self->backend.fpos;
@@ -363,6 +480,7 @@ int64_t jls_raw_chunk_tell(struct jls_raw_s * self) {
 }
 
 int32_t jls_raw_flush(struct jls_raw_s * self) {
+    ROE(wr_buf_sync(self));
     return jls_bk_fflush(&self->backend);
 }
 
@@ -377,7 +495,7 @@ int32_t jls_raw_chunk_next(struct jls_raw_s * self) {
     }
     if (pos != self->backend.fpos) {
         // sequential access
-        if (jls_bk_fseek(&self->backend, pos, SEEK_SET)) {
+        if (bk_seek(self, pos, SEEK_SET)) {
             return JLS_ERROR_EMPTY;
         }
     }
@@ -400,7 +518,7 @@ int32_t jls_raw_chunk_prev(struct jls_raw_s * self) {
     }
     if (pos != self->backend.fpos) {
         // sequential access
-        jls_bk_fseek(&self->backend, pos, SEEK_SET);
+        bk_seek(self, pos, SEEK_SET);
     }
     self->offset = self->backend.fpos;
     return 0;
@@ -415,7 +533,7 @@ int32_t jls_raw_item_next(struct jls_raw_s * self) {
     }
 
     invalidate_current_chunk(self);
-    if (jls_bk_fseek(&self->backend, pos, SEEK_SET)) {
+    if (bk_seek(self, pos, SEEK_SET)) {
         return JLS_ERROR_EMPTY;
     }
     self->offset = self->backend.fpos;
@@ -433,7 +551,7 @@ int32_t jls_raw_item_prev(struct jls_raw_s * self) {
         return JLS_ERROR_EMPTY;
     }
     invalidate_current_chunk(self);
-    RLE(jls_bk_fseek(&self->backend, pos, SEEK_SET));
+    RLE(bk_seek(self, pos, SEEK_SET));
     self->offset = self->backend.fpos;
     return 0;
 }
@@ -48,10 +48,58 @@ static void test_hdr(void **state) {
     assert_int_equal(c, jls_crc32c_hdr(&hdr));
 }
 
+#if defined(__x86_64__) || defined(_M_X64) || defined(__i386__) || defined(_M_IX86)
+
+#if defined(_MSC_VER)
+#include <intrin.h>
+#endif
+
+// implementations selected at runtime by crc32c_sw.c
+uint32_t jls_crc32c_hdr_sw(const struct jls_chunk_header_s * hdr);
+uint32_t jls_crc32c_sw(uint8_t const *data, uint32_t length);
+uint32_t jls_crc32c_hdr_sse42(const struct jls_chunk_header_s * hdr);
+uint32_t jls_crc32c_sse42(uint8_t const *data, uint32_t length);
+
+static int has_sse42(void) {
+#if defined(_MSC_VER)
+    int info[4];
+    __cpuid(info, 1);
+    return (info[2] >> 20) & 1;
+#else
+    return __builtin_cpu_supports("sse4.2");
+#endif
+}
+
+static void test_sw_vs_sse42(void **state) {
+    (void) state;
+    uint8_t data[1024 + 8];
+    for (uint32_t i = 0; i < sizeof(data); ++i) {
+        data[i] = (uint8_t) ((i * 131) ^ (i >> 3));
+    }
+    uint8_t check[] = "123456789";
+    assert_int_equal(0xe3069283, jls_crc32c_sw(check, sizeof(check) - 1));
+    if (!has_sse42()) {
+        skip();
+    }
+    for (uint32_t offset = 0; offset < 8; ++offset) {
+        for (uint32_t length = 0; length <= 1024; length += (length < 64) ? 1 : 61) {
+            assert_int_equal(jls_crc32c_sse42(data + offset, length), jls_crc32c_sw(data + offset, length));
+        }
+    }
+    struct jls_chunk_header_s hdr;
+    memcpy(&hdr, data + 3, sizeof(hdr));
+    assert_int_equal(jls_crc32c_hdr_sse42(&hdr), jls_crc32c_hdr_sw(&hdr));
+}
+
+#endif
+
 int main(void) {
     const struct CMUnitTest tests[] = {
             cmocka_unit_test(test_bytes),
             cmocka_unit_test(test_hdr),
+#if defined(__x86_64__) || defined(_M_X64) || defined(__i386__) || defined(_M_IX86)
+            cmocka_unit_test(test_sw_vs_sse42),
+#endif
     };
 
     return cmocka_run_group_tests(tests, NULL, NULL);
@@ -22,6 +22,7 @@
 #include "jls/format.h"
 #include "jls/ec.h"
 #include <stdio.h>
+#include <stdlib.h>
 #include <string.h>
 
 
@@ -248,6 +249,163 @@ static void test_end(void **state) {
     remove(filename);
 }
 
+static int64_t file_size(void) {
+    FILE * f = fopen(filename, "rb");
+    assert_non_null(f);
+    fseek(f, 0L, SEEK_END);
+    int64_t sz = (int64_t) ftell(f);
+    fclose(f);
+    return sz;
+}
+
+static void test_coalesced_writes(void **state) {
+    (void) state;
+    struct jls_raw_s * j = NULL;
+    struct jls_chunk_header_s hdr;
+    uint8_t data[sizeof(PAYLOAD1) + 16];
+    const uint32_t count = 100000;  // exceeds the write buffer several times
+    assert_int_equal(0, jls_raw_open(&j, filename, "w"));
+    for (uint32_t i = 0; i < count; ++i) {
+        hdr_set(&hdr, JLS_TAG_USER_DATA, (uint16_t) (i & 0x0fff), sizeof(PAYLOAD1));
+        assert_int_equal(0, jls_raw_wr(j, &hdr, PAYLOAD1));
+    }
+    assert_int_equal(0, jls_raw_close(j));
+    assert_int_equal(32 + count * 56, file_size());
+
+    assert_int_equal(0, jls_raw_open(&j, filename, "r"));
+    for (uint32_t i = 0; i < count; ++i) {
+        assert_int_equal(0, jls_raw_rd(j, &hdr, sizeof(data), data));
+        assert_int_equal(i & 0x0fff, hdr.chunk_meta);
+        assert_memory_equal(PAYLOAD1, data, sizeof(PAYLOAD1));
+    }
+    assert_int_equal(JLS_ERROR_EMPTY, jls_raw_chunk_next(j));
+    assert_int_equal(0, jls_raw_close(j));
+    remove(filename);
+}
+
+static void test_rewrite_header_in_buffer(void **state) {
+    (void) state;
+    struct jls_raw_s * j = NULL;
+    struct jls_chunk_header_s hdr;
+    uint8_t data[sizeof(PAYLOAD1) + 16];
+    assert_int_equal(0, jls_raw_open(&j, filename, "w"));
+    int64_t pos0 = jls_raw_chunk_tell(j);
+    assert_int_equal(0, jls_raw_wr(j, hdr_set(&hdr, JLS_TAG_USER_DATA, 1, sizeof(PAYLOAD1)), PAYLOAD1));
+    int64_t pos1 = jls_raw_chunk_tell(j);
+    assert_int_equal(0, jls_raw_wr(j, hdr_set(&hdr, JLS_TAG_USER_DATA, 2, sizeof(PAYLOAD1)), PAYLOAD1));
+    int64_t pos2 = jls_raw_chunk_tell(j);
+
+    // rewrite the first header while it is still pending in the write buffer
+    assert_int_equal(0, jls_raw_chunk_seek(j, pos0));
+    hdr_set(&hdr, JLS_TAG_USER_DATA, 1, sizeof(PAYLOAD1));
+    hdr.item_next = pos1;
+    assert_int_equal(0, jls_raw_wr_header(j, &hdr));
+    assert_int_equal(0, jls_raw_chunk_seek(j, pos2));
+    assert_int_equal(0, jls_raw_wr(j, hdr_set(&hdr, JLS_TAG_USER_DATA, 3, sizeof(PAYLOAD1)), PAYLOAD1));
+    assert_int_equal(0, jls_raw_close(j));
+    assert_int_equal(32 + 3 * 56, file_size());
+
+    assert_int_equal(0, jls_raw_open(&j, filename, "r"));
+    for (uint16_t i = 1; i <= 3; ++i) {
+        assert_int_equal(0, jls_raw_rd(j, &hdr, sizeof(data), data));
+        assert_int_equal(i, hdr.chunk_meta);
+        assert_int_equal((i == 1) ? pos1 : 0, hdr.item_next);
+        assert_memory_equal(PAYLOAD1, data, sizeof(PAYLOAD1));
+    }
+    assert_int_equal(0, jls_raw_close(j));
+    remove(filename);
+}
+
+static void test_large_payload(void **state) {
+    (void) state;
+    struct jls_raw_s * j = NULL;
+    struct jls_chunk_header_s hdr;
+    const uint32_t sz = (1 << 21) + 12;  // exceeds the write buffer
+    uint8_t * big = malloc(sz);
+    uint8_t * data = malloc(sz + 16);
+    assert_non_null(big);
+    assert_non_null(data);
+    for (uint32_t i = 0; i < sz; ++i) {
+        big[i] = (uint8_t) (i * 7);
+    }
+
+    assert_int_equal(0, jls_raw_open(&j, filename, "w"));
+    assert_int_equal(0, jls_raw_wr(j, hdr_set(&hdr, JLS_TAG_USER_DATA, 1, sizeof(PAYLOAD1)), PAYLOAD1));
+    assert_int_equal(0, jls_raw_wr(j, hdr_set(&hdr, JLS_TAG_USER_DATA, 2, sz), big));
+    assert_int_equal(0, jls_raw_wr(j, hdr_set(&hdr, JLS_TAG_USER_DATA, 3, sizeof(PAYLOAD1)), PAYLOAD1));
+    assert_int_equal(0, jls_raw_close(j));
+    assert_int_equal(32 + 56 + 32 + sz + 4 + 56, file_size());
+
+    assert_int_equal(0, jls_raw_open(&j, filename, "r"));
+    assert_int_equal(0, jls_raw_rd(j, &hdr, sz + 16, data));
+    assert_int_equal(1, hdr.chunk_meta);
+    assert_memory_equal(PAYLOAD1, data, sizeof(PAYLOAD1));
+    assert_int_equal(0, jls_raw_rd(j, &hdr, sz + 16, data));
+    assert_int_equal(2, hdr.chunk_meta);
+    assert_int_equal(sz, hdr.payload_length);
+    assert_memory_equal(big, data, sz);
+    assert_int_equal(0, jls_raw_rd(j, &hdr, sz + 16, data));
+    assert_int_equal(3, hdr.chunk_meta);
+    assert_memory_equal(PAYLOAD1, data, sizeof(PAYLOAD1));
+    assert_int_equal(0, jls_raw_close(j));
+    free(big);
+    free(data);
+    remove(filename);
+}
+
+static void test_append(void **state) {
+    (void) state;
+    struct jls_raw_s * j = NULL;
+    struct jls_chunk_header_s hdr;
+    uint8_t data[sizeof(PAYLOAD1) + 16];
+    assert_int_equal(0, jls_raw_open(&j, filename, "w"));
+    assert_int_equal(0, jls_raw_wr(j, hdr_set(&hdr, JLS_TAG_USER_DATA, 1, sizeof(PAYLOAD1)), PAYLOAD1));
+    assert_int_equal(0, jls_raw_close(j));
+
+    assert_int_equal(0, jls_raw_open(&j, filename, "a"));
+    assert_int_equal(32 + 56, jls_raw_chunk_tell(j));
+    assert_int_equal(0, jls_raw_wr(j, hdr_set(&hdr, JLS_TAG_USER_DATA, 2, sizeof(PAYLOAD1) - 1), PAYLOAD1 + 1));
+    assert_int_equal(0, jls_raw_close(j));
+    assert_int_equal(32 + 2 * 56, file_size());
+
+    assert_int_equal(0, jls_raw_open(&j, filename, "r"));
+    assert_int_equal(0, jls_raw_rd(j, &hdr, sizeof(data), data));
+    assert_int_equal(1, hdr.chunk_meta);
+    assert_memory_equal(PAYLOAD1, data, sizeof(PAYLOAD1));
+    assert_int_equal(0, jls_raw_rd(j, &hdr, sizeof(data), data));
+    assert_int_equal(2, hdr.chunk_meta);
+    assert_memory_equal(PAYLOAD1 + 1, data, sizeof(PAYLOAD1) - 1);
+    assert_int_equal(JLS_ERROR_EMPTY, jls_raw_chunk_next(j));
+    assert_int_equal(0, jls_raw_close(j));
+    remove(filename);
+}
+
+static void test_flush(void **state) {
+    (void) state;
+    struct jls_raw_s * j = NULL;
+    struct jls_chunk_header_s hdr;
+    uint8_t data[sizeof(PAYLOAD1)];
+    assert_int_equal(0, jls_raw_open(&j, filename, "w"));
+    assert_int_equal(0, jls_raw_wr(j, hdr_set(&hdr, JLS_TAG_USER_DATA, 1, sizeof(PAYLOAD1)), PAYLOAD1));
+    assert_int_equal(0, jls_raw_flush(j));
+
+    // visible to other readers before close
+    FILE * f = fopen(filename, "rb");
+    assert_non_null(f);
+    fseek(f, 0L, SEEK_END);
+    assert_int_equal(32 + 56, ftell(f));
+    fseek(f, 32 + 32, SEEK_SET);
+    assert_int_equal(sizeof(data), fread(data, 1, sizeof(data), f));
+    assert_memory_equal(PAYLOAD1, data, sizeof(PAYLOAD1));
+    fclose(f);
+
+    // writes continue after the flush
+    assert_int_equal(0, jls_raw_wr(j, hdr_set(&hdr, JLS_TAG_USER_DATA, 2, sizeof(PAYLOAD1)), PAYLOAD1));
+    assert_int_equal(0, jls_raw_close(j));
+    assert_int_equal(32 + 2 * 56, file_size());
+    remove(filename);
+}
+
 int main(void) {
     const struct CMUnitTest tests[] = {
             cmocka_unit_test(test_invalid_open),
@@ -259,6 +417,11 @@ int main(void) {
             cmocka_unit_test(test_items_nav),
             cmocka_unit_test(test_tag_to_name),
             cmocka_unit_test(test_end),
+            cmocka_unit_test(test_coalesced_writes),
+            cmocka_unit_test(test_rewrite_header_in_buffer),
+            cmocka_unit_test(test_large_payload),
+            cmocka_unit_test(test_append),
+            cmocka_unit_test(test_flush),
     };
 
     return cmocka_run_group_tests(tests, NULL, NULL);